@@ -0,0 +1,195 @@
+import numpy as np
+import pandas as pd
+
+# Grouped aggregation shared by the wildfire and automobile scripts.
+#
+# Both datasets group by tiny key spaces (12 months, 7 regions, ~20 years, a
+# handful of vehicle types, the recession flag), so composite keys are
+# encoded as one dense integer per row and reduced with np.bincount /
+# np.minimum.at kernels instead of a hash-based pandas groupby.
+
+BINCOUNT_REDUCERS = ('sum', 'count', 'mean', 'min', 'max')
+# The dense key space (product of the key cardinalities) may be at most this
+# many times the row count, else the bincount arrays would dwarf the data
+# (e.g. a float key) and fused_groupby goes through pandas instead
+MAX_DENSE_RATIO = 4
+
+
+def encode_keys(df, keys):
+    """Encode the composite key of every row as a dense integer.
+
+    Returns (ids, levels, shape): levels holds the sorted unique values of
+    each key, shape their sizes, and ids the row's position in that dense
+    key space, or -1 when any key of the row is missing.
+    """
+    codes, levels = [], []
+    for key in keys:
+        key_codes, uniques = pd.factorize(df[key], sort=True)
+        codes.append(key_codes)
+        levels.append(uniques)
+    shape = tuple(len(uniques) for uniques in levels)
+    missing = np.zeros(len(df), dtype=bool)
+    for key_codes in codes:
+        missing |= key_codes < 0
+    ids = np.ravel_multi_index([np.where(missing, 0, c) for c in codes], shape)
+    ids[missing] = -1
+    return ids, levels, shape
+
+
+def _reduce(ids, values, reducer, size):
+    """Reduce values (already restricted to rows with a valid key) per id."""
+    valid = ~pd.isna(values)
+    ids, values = ids[valid], values[valid]
+    counts = np.bincount(ids, minlength=size)
+    if reducer == 'count':
+        return counts
+    weights = values.astype('float64')
+    if reducer in ('sum', 'mean'):
+        sums = np.bincount(ids, weights=weights, minlength=size)
+        if reducer == 'sum':
+            return sums
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return sums / counts
+    out = np.full(size, np.inf if reducer == 'min' else -np.inf)
+    (np.minimum if reducer == 'min' else np.maximum).at(out, ids, weights)
+    out[counts == 0] = np.nan
+    return out
+
+
+def _result_dtype(dtype, reducer):
+    """dtype of a pandas groupby reduction of a column of dtype (integer
+    sums that do not fit it aside, see bincount_groupby)."""
+    if reducer == 'count':
+        return np.dtype('int64')
+    if reducer == 'mean':
+        return dtype if dtype == np.float32 else np.dtype('float64')
+    if reducer == 'sum' and dtype.kind == 'b':
+        return np.dtype('int64')
+    return dtype
+
+
+def bincount_groupby(df, keys, aggs, encoded=None):
+    """fused_groupby restricted to BINCOUNT_REDUCERS, computed with bincount kernels.
+
+    encoded is encode_keys(df, keys) when the caller already has it.
+    """
+    ids, levels, shape = encoded if encoded is not None else encode_keys(df, keys)
+    size = int(np.prod(shape))
+    keep = ids >= 0
+    ids = ids[keep]
+    observed = np.flatnonzero(np.bincount(ids, minlength=size))
+    results = {}
+    for name, (column, reducer) in aggs.items():
+        values = df[column].to_numpy()[keep]
+        result = _reduce(ids, values, reducer, size)[observed]
+        # Same result types as pandas: the kernels work in float64 / int64,
+        # sums/min/max come back in the column's own dtype
+        dtype = _result_dtype(values.dtype, reducer)
+        if dtype.kind in 'iub' and result.dtype.kind == 'f':
+            result = result.astype('int64')
+        if (reducer == 'sum' and dtype.kind in 'iu' and len(result)
+                and not np.iinfo(dtype).min <= result.min() <= result.max() <= np.iinfo(dtype).max):
+            # Sums that overflow the column's dtype are widened to 64 bits
+            dtype = np.dtype(dtype.kind + '8')
+        results[name] = result.astype(dtype, copy=False)
+    positions = np.unravel_index(observed, shape)
+    if len(keys) == 1:
+        index = pd.Index(levels[0].take(positions[0]), name=keys[0])
+    else:
+        index = pd.MultiIndex.from_arrays(
+            [level.take(pos) for level, pos in zip(levels, positions)], names=keys)
+    return pd.DataFrame(results, index=index)
+
+
+def fused_groupby(df, keys, aggs, engine='bincount'):
+    """Compute several (column, reducer) pairs over one grouping of df.
+
+    aggs maps output names to (column, reducer) tuples, e.g.
+    {'area': ('Estimated_fire_area', 'mean'), 'pixels': ('Count', 'sum')}.
+    The keys are factorized once and every reducer runs over that same
+    grouping, instead of one groupby (and one factorization) per measure.
+    Returns a frame indexed by keys with one column per output name.
+
+    With engine='bincount' (the default) sum/count/mean/min/max use the
+    dense-key bincount kernels as long as the dense key space stays within
+    MAX_DENSE_RATIO times the row count; other reducers, larger key spaces
+    or engine='pandas' go through a regular pandas groupby.
+    """
+    if (engine == 'bincount' and len(df)
+            and all(reducer in BINCOUNT_REDUCERS for _, reducer in aggs.values())):
+        encoded = encode_keys(df, list(keys))
+        if np.prod(encoded[2], dtype='float64') <= MAX_DENSE_RATIO * len(df):
+            return bincount_groupby(df, list(keys), aggs, encoded)
+    return df.groupby(keys, observed=True, sort=True).agg(**aggs)
+
+
+class Moments:
+    """Mergeable count, mean and M2 (sum of squared deviations) of a sample.
+
+    Partitions combine with the parallel formulas of Chan et al., so
+    statistics can be built per partition, merged in any order and updated
+    incrementally. n, mean and m2 may be scalars or equally shaped arrays.
+    """
+
+    def __init__(self, n, mean, m2):
+        self.n = n
+        self.mean = mean
+        self.m2 = m2
+
+    @classmethod
+    def from_summary(cls, n, mean, var):
+        """Moments of a sample summarised as (n, mean, sample variance)."""
+        n = np.asarray(n, dtype='float64')
+        m2 = np.nan_to_num(np.asarray(var, dtype='float64')) * np.maximum(n - 1, 0)
+        return cls(n, np.asarray(mean, dtype='float64'), m2)
+
+    def merge(self, other):
+        n = self.n + other.n
+        with np.errstate(invalid='ignore', divide='ignore'):
+            delta = other.mean - self.mean
+            mean = np.where(n > 0, self.mean + delta * other.n / n, np.nan)
+            m2 = self.m2 + other.m2 + np.where(n > 0, delta ** 2 * self.n * other.n / n, 0)
+        # An empty side contributes nothing (its mean is undefined)
+        mean = np.where(self.n == 0, other.mean, np.where(other.n == 0, self.mean, mean))
+        return Moments(n, mean, m2)
+
+    __add__ = merge
+
+    @property
+    def var(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.n > 1, self.m2 / (self.n - 1), np.nan)
+
+    @property
+    def std(self):
+        return np.sqrt(self.var)
+
+
+def grouped_moments(df, keys, n_col='Count', mean_col='Mean_confidence', var_col='Var_confidence'):
+    """Count-weighted moments per group of rows that are themselves summaries.
+
+    Each row describes n_col observations with mean mean_col and sample
+    variance var_col (e.g. one day of wildfire pixel confidence). The result
+    is what merging every row's Moments within a group gives, computed with
+    two bincount passes: a frame indexed by keys with n, mean, m2, var, std.
+    """
+    rows = Moments.from_summary(df[n_col].to_numpy(), df[mean_col].to_numpy(),
+                                df[var_col].to_numpy())
+    ids, levels, shape = encode_keys(df, keys)
+    keep = ids >= 0
+    ids = ids[keep]
+    n, mean, m2 = rows.n[keep], rows.mean[keep], rows.m2[keep]
+    size = int(np.prod(shape))
+    total_n = np.bincount(ids, weights=n, minlength=size)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        total_mean = np.bincount(ids, weights=n * mean, minlength=size) / total_n
+    total_m2 = np.bincount(ids, weights=m2 + n * (mean - total_mean[ids]) ** 2, minlength=size)
+    observed = np.flatnonzero(np.bincount(ids, minlength=size))
+    result = Moments(total_n[observed], total_mean[observed], total_m2[observed])
+    positions = np.unravel_index(observed, shape)
+    index = pd.MultiIndex.from_arrays(
+        [level.take(pos) for level, pos in zip(levels, positions)], names=keys)
+    if len(keys) == 1:
+        index = index.get_level_values(0)
+    return pd.DataFrame({'n': result.n, 'mean': result.mean, 'm2': result.m2,
+                         'var': result.var, 'std': result.std}, index=index)
@@ -1,23 +1,183 @@
-import pandas as pd
 import dash
 from dash import html, dcc
-from dash.dependencies import Input, Output, State
+from dash.dependencies import ClientsideFunction, Input, Output, State
 import plotly.graph_objects as go
-import plotly.express as px
-from dash import no_update
+from dash import Patch, no_update
 import datetime as dt
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from wildfire_data import DATA_URL, build_cube, fetch_wildfires, month_frame, source_version
+from figure_cache import FigureCache
+from warmup import Warmup
+from typed_arrays import encode_figure, typed_array
+from response_pipeline import ResponsePipeline
+from shared_store import SharedFigureStore, shared_cube
+from data_version import DataVersion, DataVersionManager
+from single_flight import SingleFlight
+from metrics import CallbackMetrics
+from figure_factory import FigureFactory
+import json
+from flask import Response
 #Create app
 app = dash.Dash(__name__)
+#WSGI entry point for gunicorn (as2:server), see gunicorn.conf.py
+server = app.server
 # Clear the layout and do not display exception till callback gets executed
 app.config.suppress_callback_exceptions = True
-# Read the wildfire data into pandas dataframe
-df =  pd.read_csv('https://cf-courses-data.s3.us.cloud-object-storage.appdomain.cloud/IBMDeveloperSkillsNetwork-DV0101EN-SkillsNetwork/Data%20Files/Historical_Wildfires.csv')
-#Extract year and month from the date column
-df['Month'] = pd.to_datetime(df['Date']).dt.month_name() #used for the names of the months
-df['Year'] = pd.to_datetime(df['Date']).dt.year
-#Layout Section of Dash
+#orjson encoding plus br/gzip compression of responses, with per-response timings
+response_pipeline = ResponsePipeline(app.server)
+#Latency histograms per callback phase (filtering, aggregation, figure
+#construction, serialization), served on /metrics in Prometheus text format
+metrics = CallbackMetrics(app.server)
+#Wildfire data source (watched for changes) and its local cache
+DATA_SOURCE = os.environ.get('WILDFIRE_DATA_URL', DATA_URL)
+CACHE_DIR = os.environ.get('WILDFIRE_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'wildfire_cache'))
+#Build one data version: the cube of the freshly read frame
+def load_data(version):
+    # Read the wildfire data into pandas dataframe
+    # Goes through a local cache (revalidated with conditional requests), so
+    # restarts skip the download when the file is unchanged and work offline
+   df = fetch_wildfires(DATA_SOURCE, CACHE_DIR)
+    #Year and Month (1-12) come typed from the loader, no per-start date parsing
+    #Per (Region, Year, Month) sums/counts, built once per version so callbacks
+    #never scan df; the frame itself is dropped once the cube is built
+   cube = build_cube(df, version=version)
+   return DataVersion(version, cube)
+
+#SHARED_STORE=<name> keeps the cube and the rendered views in shared memory,
+#one copy for all worker processes instead of one each (see shared_store.py)
+SHARED_STORE = os.environ.get('SHARED_STORE')
+shared_views = SharedFigureStore(SHARED_STORE + '-views') if SHARED_STORE else None
+#Attach the published cube of this data version; only one worker loads and
+#publishes it (replacing a segment left by an earlier run with other data)
+def load_shared(version):
+   cube = shared_cube(SHARED_STORE + '-cube', version, lambda: load_data(version or 0).cube)
+   return DataVersion(cube.version, cube)
+
+if SHARED_STORE:
+    current = load_shared(source_version(DATA_SOURCE))
+else:
+    current = load_data(source_version(DATA_SOURCE) or 0)
+#Rendered (pie, bar) figures keyed by (region, year, data version), LRU bounded
+figure_cache = FigureCache(maxsize=int(os.environ.get('FIGURE_CACHE_SIZE', 128)))
+#Year-range figures get their own LRU: dragging the slider goes through far more
+#keys (up to 6 x 136 ranges) than there are year views, and must not evict those
+range_figure_cache = FigureCache(maxsize=int(os.environ.get('RANGE_FIGURE_CACHE_SIZE', 256)))
+#A new data version makes every cached figure stale. Old-version callbacks still
+#in flight may put theirs back; nothing looks those keys up and the LRU ages them out
+def drop_old_figures(old, new):
+   figure_cache.clear()
+   range_figure_cache.clear()
+
+#Identical callbacks running at the same time (e.g. everyone opening the default
+#NSW/2005 view at once) wait on one computation and share its result
+flights = SingleFlight()
+#Hot reload: the source is polled every DATA_RELOAD_INTERVAL seconds (0 = off) and
+#a changed file is loaded off the request path and swapped in. Callbacks read
+#versions.current once and use that version throughout. With SHARED_STORE the
+#first worker to notice loads and republishes the cube, the others re-attach
+versions = DataVersionManager(load_shared if SHARED_STORE else load_data,
+                              lambda: source_version(DATA_SOURCE),
+                              interval=float(os.environ.get('DATA_RELOAD_INTERVAL', 60)),
+                              on_swap=drop_old_figures, current=current)
+#Closed set of views offered by the radio items and the year dropdown
+#(years as loaded at startup, the page layout uses the current version's)
+REGIONS = ['NSW','QL','SA','TA','VI','WA']
+YEARS = versions.current.cube.years
+#CLIENTSIDE=1 ships the cube to the browser and renders region/year changes there
+CLIENTSIDE = os.environ.get('CLIENTSIDE') == '1'
+#px.pie / px.bar skeletons built once; each view only fills in its data and title
+figure_factory = FigureFactory()
+#Render the (pie, bar) pair from one region's monthly means
+def make_figures(month_data, input_region, period):
+    #Plot one - Monthly Average Estimated Fire Area
+   
+   fig1 = figure_factory.pie(month_data['Month'], month_data['Estimated_fire_area'], "{} : Monthly Average Estimated Fire Area in {}".format(input_region,period))
+   
+     #Plot two - Monthly Average Count of Pixels for Presumed Vegetation Fires
+
+   fig2 = figure_factory.bar(month_data['Month'], month_data['Count'], '{} : Average Count of Pixels for Presumed Vegetation Fires in {}'.format(input_region,period))
+    
+   return fig1, fig2
+
+def build_figures(input_region, input_year, cube):
+    #data - O(12) slice of the precomputed cube instead of filtering df
+   with metrics.phase('filtering'):
+      sums, counts = cube.cells(input_region, input_year)
+   with metrics.phase('aggregation'):
+      month_data = month_frame(sums, counts)
+   with metrics.phase('figure_construction'):
+      return make_figures(month_data, input_region, 'year {}'.format(input_year))
+
+def build_range_figures(input_region, start, end, cube):
+   with metrics.phase('filtering'):
+      sums, counts = cube.range_cells(input_region, start, end)
+   with metrics.phase('aggregation'):
+      month_data = month_frame(sums, counts)
+   with metrics.phase('figure_construction'):
+      return make_figures(month_data, input_region, 'years {}-{}'.format(start, end))
+
+def cached_figures(input_region, input_year, cube=None):
+   cube = cube or versions.current.cube
+   key = (input_region, input_year, cube.version)
+   return figure_cache.get_or_build(key, lambda: build_figures(input_region, input_year, cube))
+
+def cached_range_figures(input_region, start, end, cube=None):
+   cube = cube or versions.current.cube
+   key = ('range', input_region, start, end, cube.version)
+   return range_figure_cache.get_or_build(key, lambda: build_range_figures(input_region, start, end, cube))
+
+#Only trace data and titles differ between views, so callbacks send a Patch of
+#those into the persistent graphs instead of whole new dcc.Graph components.
+#Numeric arrays go out as base64 typed arrays rather than decimal text
+def patch_data(fig1, fig2):
+   return {'pie': {'labels': list(fig1.data[0].labels), 'values': typed_array(fig1.data[0].values),
+                   'title': fig1.layout.title.text},
+           'bar': {'x': list(fig2.data[0].x), 'y': typed_array(fig2.data[0].y),
+                   'title': fig2.layout.title.text}}
+
+def data_patches(data):
+   pie = Patch()
+   pie['data'][0]['labels'] = data['pie']['labels']
+   pie['data'][0]['values'] = data['pie']['values']
+   pie['layout']['title']['text'] = data['pie']['title']
+   bar = Patch()
+   bar['data'][0]['x'] = data['bar']['x']
+   bar['data'][0]['y'] = data['bar']['y']
+   bar['layout']['title']['text'] = data['bar']['title']
+   return [pie, bar]
+
+def patch_figures(fig1, fig2):
+   return data_patches(patch_data(fig1, fig2))
+
+#With SHARED_STORE the patch data of each view is kept as JSON in shared memory,
+#so a view rendered by one worker is served by all of them
+def view_patches(key, figures, cube):
+   if shared_views is None:
+      figs = figures()
+      with metrics.phase('figure_construction'):
+         return patch_figures(*figs)
+   stored = shared_views.get(key, cube.version)
+   if stored is not None:
+      with metrics.phase('figure_construction'):
+         return data_patches(json.loads(stored))
+   figs = figures()
+   with metrics.phase('figure_construction'):
+      data = patch_data(*figs)
+   shared_views.put(key, cube.version, json.dumps(data).encode())
+   with metrics.phase('figure_construction'):
+      return data_patches(data)
+
+#Layout Section of Dash, built per page load from the current data version
+def serve_layout():
+   cube = versions.current.cube
+   years = cube.years
+    #Persistent graphs, created with the default views and patched afterwards
+   initial_figures = cached_figures('NSW', 2005, cube)
+   initial_range_figures = cached_range_figures('NSW', min(years), max(years), cube)
 #Task 2.1 Add the Title to the Dashboard
-app.layout = html.Div(children=[html.H1('Australia Wildfire Dashboard', 
+   return html.Div(children=[html.H1('Australia Wildfire Dashboard', 
                                 style={'textAlign': 'center', 'color': '#503D36',
                                 'font-size': 26}),
 
@@ -28,7 +188,7 @@ app.layout = html.Div(children=[html.H1('Australia Wildfire Dashboard',
                     html.Div([
                             html.H2('Select Region:', style={'margin-right': '2em'}),
              #Radio items to select the region
-             dcc.RadioItems(['NSW','QL','SA','TA','VI','WA'], 'NSW', id='region',inline=True)
+             dcc.RadioItems(REGIONS, 'NSW', id='region',inline=True)
                             ]),
             
 
@@ -37,52 +197,139 @@ app.layout = html.Div(children=[html.H1('Australia Wildfire Dashboard',
                     #Dropdown to select year
                     html.Div([
                             html.H2('Select year ', style={'margin-right': '2em'}),
-                        dcc.Dropdown(df.Year.unique(), value = 2005,id='year')
+                        dcc.Dropdown(years, value = 2005,id='year')
                     ]),
 #Second Inner division for adding 2 inner divisions for 2 output graphs
 #TASK 2.3: Add two empty divisions for output inside the next inner division.
                    html.Div([
-    html.Div([], id='plot1', style={'flex': '1', 'margin-right': '1em'}),  # First div with margin-right
-    html.Div([], id='plot2', style={'flex': '1'})  # Second div
+    html.Div([dcc.Graph(id='graph1', figure=encode_figure(initial_figures[0]))], id='plot1', style={'flex': '1', 'margin-right': '1em'}),  # First div with margin-right
+    html.Div([dcc.Graph(id='graph2', figure=encode_figure(initial_figures[1]))], id='plot2', style={'flex': '1'})  # Second div
 ], style={
     'display': 'flex',            # Set parent div to flex display
     'justify-content': 'space-between',  # Add spacing between divs
     'margin-right': '2em'
+}),
+                   #Compact aggregate cube plus the figure skeletons for the clientside
+                   #callback, sent with the page
+                   dcc.Store(id='cube-store', data=dict(cube.to_client(), figures=figure_factory.to_client())
+                             if CLIENTSIDE else None),
+                   #Year range slider, answered from the cube's per-year prefix sums
+                    html.Div([
+                            html.H2('Select year range ', style={'margin-right': '2em'}),
+                        dcc.RangeSlider(min(years), max(years), 1, value=[min(years), max(years)],
+                                        marks={y: str(y) for y in years}, id='year-range')
+                    ]),
+                   html.Div([
+    html.Div([dcc.Graph(id='graph3', figure=encode_figure(initial_range_figures[0]))], id='plot3', style={'flex': '1', 'margin-right': '1em'}),
+    html.Div([dcc.Graph(id='graph4', figure=encode_figure(initial_range_figures[1]))], id='plot4', style={'flex': '1'})
+], style={
+    'display': 'flex',
+    'justify-content': 'space-between',
+    'margin-right': '2em'
 })
 
     ])
     #outer division ends
 
 ])
+app.layout = serve_layout
 #layout ends
-#TASK 2.4: Add the Ouput and input components inside the app.callback decorator.
-#Place to add @app.callback Decorator
-@app.callback([Output(component_id='plot1', component_property='children'),
-               Output(component_id='plot2', component_property='children')],
-               [Input(component_id='region', component_property='value'),
-                Input(component_id='year', component_property='value')])
-
-   
 #TASK 2.5: Add the callback function.
 #Place to define the callback function .
 def reg_year_display(input_region,input_year):
     
-    #data
-   region_data = df[df['Region'] == input_region]
-   y_r_data = region_data[region_data['Year']==input_year]
-    #Plot one - Monthly Average Estimated Fire Area
-   
-   est_data = y_r_data.groupby('Month')['Estimated_fire_area'].mean().reset_index()
- 
-   fig1 = px.pie(est_data, values='Estimated_fire_area', names='Month', title="{} : Monthly Average Estimated Fire Area in year {}".format(input_region,input_year))
-   
-     #Plot two - Monthly Average Count of Pixels for Presumed Vegetation Fires
-   veg_data = y_r_data.groupby('Month')['Count'].mean().reset_index()
-
-   fig2 = px.bar(veg_data, x='Month', y='Count', title='{} : Average Count of Pixels for Presumed Vegetation Fires in year {}'.format(input_region,input_year))
+   cube = versions.current.cube
+   key = 'year|{}|{}'.format(input_region, input_year)
     
-   return [dcc.Graph(figure=fig1),
-            dcc.Graph(figure=fig2) ]
+   return flights.do((key, cube.version), lambda: view_patches(
+       key, lambda: cached_figures(input_region, input_year, cube), cube))
+
+#TASK 2.4: Add the Ouput and input components inside the app.callback decorator.
+if CLIENTSIDE:
+    #Rendered in the browser from cube-store, no server round trip per change
+    app.clientside_callback(ClientsideFunction(namespace='wildfire', function_name='render'),
+                            [Output(component_id='graph1', component_property='figure'),
+                             Output(component_id='graph2', component_property='figure')],
+                            [Input(component_id='region', component_property='value'),
+                             Input(component_id='year', component_property='value')],
+                            State(component_id='cube-store', component_property='data'))
+else:
+    app.callback([Output(component_id='graph1', component_property='figure'),
+                  Output(component_id='graph2', component_property='figure')],
+                 [Input(component_id='region', component_property='value'),
+                  Input(component_id='year', component_property='value')])(metrics.callback(reg_year_display))
+
+#Year range view: two prefix-sum lookups per month whatever the range length
+@app.callback([Output(component_id='graph3', component_property='figure'),
+               Output(component_id='graph4', component_property='figure')],
+               [Input(component_id='region', component_property='value'),
+                Input(component_id='year-range', component_property='value')])
+@metrics.callback
+def reg_range_display(input_region, year_range):
+   start, end = year_range
+   cube = versions.current.cube
+   key = 'range|{}|{}|{}'.format(input_region, start, end)
+   return flights.do((key, cube.version), lambda: view_patches(
+       key, lambda: cached_range_figures(input_region, start, end, cube), cube))
+
+#Hit/miss counters so the figure caches can be sized
+@app.server.route('/cache-stats')
+def cache_stats():
+    stats = figure_cache.stats()
+    stats['range'] = range_figure_cache.stats()
+    if shared_views is not None:
+        stats['shared'] = shared_views.stats()
+    return stats
+
+#Start watching the data source in whichever process serves requests, so it
+#also runs in every worker forked from a preloading gunicorn master
+@app.server.before_request
+def watch_data():
+    versions.start()
+
+#How many callbacks were answered by joining an identical one in flight
+@app.server.route('/coalesce-stats')
+def coalesce_stats():
+    return flights.stats()
+
+#Current data version and reload counters
+@app.server.route('/data-version')
+def data_version():
+    return versions.status()
+
+#Prometheus scrape endpoint; numbers are per process, like the other stats routes
+metrics.counter('wildfire_figure_cache_lookups_total', 'Figure cache lookups by outcome.',
+                lambda: {'hit': figure_cache.hits, 'miss': figure_cache.misses})
+metrics.counter('wildfire_range_figure_cache_lookups_total', 'Year-range figure cache lookups by outcome.',
+                lambda: {'hit': range_figure_cache.hits, 'miss': range_figure_cache.misses})
+metrics.counter('dash_callbacks_coalesced_total', 'Callbacks answered by an identical one in flight.',
+                lambda: flights.coalesced)
+metrics.counter('wildfire_data_reloads_total', 'Data versions swapped in since startup.',
+                lambda: versions.reloads)
+
+@app.server.route('/metrics')
+def prometheus_metrics():
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+#Serialization time and raw/sent byte totals of the response pipeline
+@app.server.route('/response-stats')
+def response_stats():
+    return response_pipeline.stats()
+
+#Optional warm-up: WARMUP=1 renders every region/year view in the background
+warmup = None
+if os.environ.get('WARMUP') == '1':
+    #Goes through the callback so SHARED_STORE views are filled as well
+    warmup = Warmup(REGIONS, YEARS, reg_year_display,
+                    workers=int(os.environ.get('WARMUP_WORKERS', 4))).start()
+
+#Readiness probe, 503 until the warm-up has rendered every view
+@app.server.route('/ready')
+def ready():
+    if warmup is None:
+        return {'ready': True}
+    status = warmup.status()
+    return status, 200 if status['ready'] else 503
 
 if __name__ == '__main__':
     app.run_server()
\ No newline at end of file
@@ -0,0 +1,42 @@
+// Browser-side rendering of the region/year view (CLIENTSIDE=1 in as2.py).
+// The aggregate cube arrives once per page load in the 'cube-store' dcc.Store,
+// so changing the region or year never goes back to the server. It carries
+// the server's FigureFactory skeletons (trace and layout properties plus the
+// template), so only the data and the title are filled in here and the
+// figures look the same as the server-rendered ones.
+function fillFigure(skeleton, template, data, title) {
+    var trace = Object.assign({}, skeleton.trace, data);
+    var layout = Object.assign({}, skeleton.layout, {
+        template: template,
+        title: Object.assign({}, skeleton.layout.title, {text: title})
+    });
+    return {data: [trace], layout: layout};
+}
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    wildfire: {
+        render: function (region, year, cube) {
+            if (!cube) {
+                return [window.dash_clientside.no_update, window.dash_clientside.no_update];
+            }
+            var months = [], area = [], count = [];
+            var r = cube.regions.indexOf(region);
+            var y = cube.years.indexOf(Number(year));
+            if (r >= 0 && y >= 0) {
+                cube.means[r][y].forEach(function (values, m) {
+                    if (values !== null) {
+                        months.push(cube.months[m]);
+                        area.push(values[0]);
+                        count.push(values[1]);
+                    }
+                });
+            }
+            var figures = cube.figures;
+            var pie = fillFigure(figures.pie, figures.template, {labels: months, values: area},
+                                 region + ' : Monthly Average Estimated Fire Area in year ' + year);
+            var bar = fillFigure(figures.bar, figures.template, {x: months, y: count},
+                                 region + ' : Average Count of Pixels for Presumed Vegetation Fires in year ' + year);
+            return [pie, bar];
+        }
+    }
+});
@@ -0,0 +1,74 @@
+import os
+import threading
+import time
+from collections import namedtuple
+
+# One loaded copy of the wildfire data: every request is answered from the
+# cube, so the frame it was built from is not kept
+DataVersion = namedtuple('DataVersion', ['version', 'cube'])
+
+
+class DataVersionManager:
+    """Holds the current DataVersion and swaps in a new one when the source changes.
+
+    Readers take current once per request and use only that snapshot
+    (read-copy-update): a reload builds the next version on the watcher
+    thread and publishes it with one reference assignment, so in-flight
+    callbacks are never blocked and finish on the version they started with.
+    probe() returns the source's version as it is now (None when it cannot
+    tell), load(version) builds a DataVersion, and on_swap(old, new) runs
+    after each swap to drop whatever was cached for the old version.
+    """
+
+    def __init__(self, load, probe, interval=60, on_swap=None, current=None):
+        self.load = load
+        self.probe = probe
+        self.interval = interval
+        self.on_swap = on_swap
+        self.current = current if current is not None else load(probe() or 0)
+        self.loaded_at = time.time()
+        self.reloads = 0
+        self.failures = 0
+        self.last_error = None
+        self._reload_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._pid = None
+
+    def start(self):
+        """Start the watcher thread in this process, again in each forked worker."""
+        if self.interval > 0 and self._pid != os.getpid():
+            with self._start_lock:
+                if self._pid != os.getpid():
+                    self._pid = os.getpid()
+                    threading.Thread(target=self._watch, name='data-watch', daemon=True).start()
+        return self
+
+    def _watch(self):
+        while True:
+            time.sleep(self.interval)
+            self.check()
+
+    def check(self):
+        """Reload if the source changed; True when a new version was swapped in."""
+        with self._reload_lock:
+            try:
+                version = self.probe()
+                if version is None or version == self.current.version:
+                    return False
+                new = self.load(version)
+            except Exception as e:
+                # Keep serving the current version, try again on the next poll
+                self.failures += 1
+                self.last_error = repr(e)
+                return False
+            old, self.current = self.current, new
+            self.loaded_at = time.time()
+            self.reloads += 1
+        if self.on_swap is not None:
+            self.on_swap(old, new)
+        return True
+
+    def status(self):
+        return {'version': self.current.version, 'loaded_at': self.loaded_at,
+                'reloads': self.reloads, 'failures': self.failures,
+                'last_error': self.last_error, 'watching': self._pid == os.getpid()}
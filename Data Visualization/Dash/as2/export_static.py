@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+import sys
+
+import plotly
+from plotly.io.json import to_json_plotly
+from plotly.offline import get_plotlyjs
+
+# Static export of the region/year view: every (region, year) pair as figure
+# JSON plus an HTML shell and plotly.js, servable from any static file server
+# or CDN with no Python at request time. Builds are incremental: a view is
+# rewritten only when its cube cells (or the export format) changed.
+# Run: python as2/export_static.py [out_dir]   (default: as2/static_export)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(HERE)
+import as2
+from typed_arrays import encode_figure
+from wildfire_data import write_atomic
+
+# Bump when the figures or the shell change, so the next build redoes every view
+EXPORT_FORMAT = 1
+
+SHELL = '''<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Australia Wildfire Dashboard</title>
+<script src="plotly.min.js"></script>
+</head>
+<body>
+<h1 style="text-align: center; color: #503D36; font-size: 26px">Australia Wildfire Dashboard</h1>
+<div><h2>Select Region:</h2><div id="region"></div></div>
+<div><h2>Select year</h2><select id="year"></select></div>
+<div style="display: flex; justify-content: space-between; margin-right: 2em">
+  <div id="graph1" style="flex: 1; margin-right: 1em"></div>
+  <div id="graph2" style="flex: 1"></div>
+</div>
+<script>
+var VIEWS = __VIEWS__;
+var regionBox = document.getElementById('region'), yearBox = document.getElementById('year');
+VIEWS.regions.forEach(function (region, i) {
+    var label = document.createElement('label');
+    label.innerHTML = '<input type="radio" name="region" value="' + region + '"' + (i ? '' : ' checked') + '> ' + region + ' ';
+    regionBox.appendChild(label);
+});
+VIEWS.years.forEach(function (year) {
+    yearBox.add(new Option(year, year, year === VIEWS.year, year === VIEWS.year));
+});
+function show() {
+    var region = document.querySelector('input[name=region]:checked').value;
+    fetch('views/' + region + '-' + yearBox.value + '.json')
+        .then(function (response) { return response.json(); })
+        .then(function (view) {
+            Plotly.react('graph1', view.pie.data, view.pie.layout);
+            Plotly.react('graph2', view.bar.data, view.bar.layout);
+        });
+}
+regionBox.addEventListener('change', show);
+yearBox.addEventListener('change', show);
+show();
+</script>
+</body>
+</html>
+'''
+
+
+def view_digest(cube, region, year):
+    """Fingerprint of everything one view's JSON is rendered from."""
+    sums, counts = cube.cells(region, year)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update('{}|{}|{}|{}'.format(EXPORT_FORMAT, plotly.__version__, region, year).encode())
+    digest.update(sums.tobytes())
+    digest.update(counts.tobytes())
+    return digest.hexdigest()
+
+
+def export(out_dir, cube):
+    """Write all views to out_dir; returns (written, unchanged, removed) counts."""
+    views_dir = os.path.join(out_dir, 'views')
+    os.makedirs(views_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, 'manifest.json')
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    built = {}
+    written = unchanged = 0
+    for region in as2.REGIONS:
+        for year in cube.years:
+            name = '{}-{}'.format(region, year)
+            digest = view_digest(cube, region, year)
+            path = os.path.join(views_dir, name + '.json')
+            built[name] = digest
+            if manifest.get(name) == digest and os.path.exists(path):
+                unchanged += 1
+                continue
+            fig1, fig2 = as2.build_figures(region, year, cube)
+            view = {'pie': encode_figure(fig1), 'bar': encode_figure(fig2)}
+            write_atomic(path, to_json_plotly(view).encode())
+            written += 1
+    # Views that no longer exist in the data (e.g. a year dropped from the source)
+    removed = 0
+    for name in set(manifest) - set(built):
+        path = os.path.join(views_dir, name + '.json')
+        if os.path.exists(path):
+            os.remove(path)
+        removed += 1
+
+    plotly_js = get_plotlyjs().encode()
+    plotly_path = os.path.join(out_dir, 'plotly.min.js')
+    if not os.path.exists(plotly_path) or os.path.getsize(plotly_path) != len(plotly_js):
+        write_atomic(plotly_path, plotly_js)
+    views = {'regions': as2.REGIONS, 'years': cube.years, 'year': 2005 if 2005 in cube.years else cube.years[0]}
+    write_atomic(os.path.join(out_dir, 'index.html'), SHELL.replace('__VIEWS__', json.dumps(views)).encode())
+    # Manifest last, so an interrupted build redoes whatever it had not recorded
+    write_atomic(manifest_path, json.dumps(built, indent=1, sort_keys=True).encode())
+    return written, unchanged, removed
+
+
+if __name__ == '__main__':
+    out_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join(HERE, 'static_export')
+    written, unchanged, removed = export(out_dir, as2.versions.current.cube)
+    print('{}: {} views written, {} unchanged, {} removed'.format(out_dir, written, unchanged, removed))
@@ -0,0 +1,52 @@
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+
+
+class FigureFactory:
+    """Pie and bar figures filled into skeletons built once with plotly.express.
+
+    px validates its arguments, resolves the template and converts the frame
+    to traces on every call, which costs more than the monthly data work.
+    The skeletons keep every trace and layout property px produces for these
+    columns except the data, the title and the default template (go.Figure
+    applies that one itself). Each call fills in labels/values or x/y and the
+    title only, and returns the same figure px would have built.
+    """
+
+    def __init__(self, names='Month', pie_values='Estimated_fire_area', bar_y='Count'):
+        sample = pd.DataFrame({names: ['January'], pie_values: [0.0], bar_y: [0.0]})
+        self._pie = self._skeleton(px.pie(sample, values=pie_values, names=names, title=' '),
+                                   ('labels', 'values'))
+        self._bar = self._skeleton(px.bar(sample, x=names, y=bar_y, title=' '), ('x', 'y'))
+
+    @staticmethod
+    def _skeleton(fig, data_keys):
+        spec = fig.to_plotly_json()
+        trace = {k: v for k, v in spec['data'][0].items() if k not in data_keys}
+        layout = {k: v for k, v in spec['layout'].items() if k != 'template'}
+        return trace, layout
+
+    @staticmethod
+    def _fill(skeleton, data, title):
+        trace, layout = skeleton
+        return go.Figure({'data': [dict(trace, **data)],
+                          'layout': dict(layout, title=dict(layout.get('title', {}), text=title))})
+
+    def pie(self, labels, values, title):
+        return self._fill(self._pie, {'labels': labels, 'values': values}, title)
+
+    def bar(self, x, y, title):
+        return self._fill(self._bar, {'x': x, 'y': y}, title)
+
+    def to_client(self):
+        """The skeletons as JSON for the browser, which fills them in the same way.
+
+        go.Figure applies the default template on the server; it is shipped
+        once here for both figures.
+        """
+        template = pio.templates[pio.templates.default].to_plotly_json()
+        return {'template': template,
+                'pie': {'trace': self._pie[0], 'layout': self._pie[1]},
+                'bar': {'trace': self._bar[0], 'layout': self._bar[1]}}
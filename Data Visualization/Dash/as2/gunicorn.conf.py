@@ -0,0 +1,38 @@
+import gc
+import os
+import sys
+
+# Multi-worker deployment of the dashboard:
+#   gunicorn -c as2/gunicorn.conf.py as2:server
+# With preload_app the master imports as2 once (download/cache read, cube and
+# an optional WARMUP=1 figure warm-up), then forks the workers, which share
+# those pages copy-on-write instead of each loading its own copy.
+# Without preloading, SHARED_STORE=<name> gives the same single copy of the
+# cube (plus views rendered by any worker) through shared memory instead.
+
+chdir = os.path.dirname(os.path.abspath(__file__))
+bind = os.environ.get('BIND', '0.0.0.0:8050')
+workers = int(os.environ.get('WEB_CONCURRENCY', 4))
+preload_app = os.environ.get('PRELOAD', '1') == '1'
+# Threads per worker (gthread when > 1); identical callbacks on the threads of
+# one worker are coalesced into a single computation
+threads = int(os.environ.get('WEB_THREADS', 1))
+
+
+def when_ready(server):
+    """Runs in the master after the app is preloaded and before workers fork."""
+    as2 = sys.modules.get('as2')
+    if as2 is not None and as2.warmup is not None:
+        # Fork only once the figure cache is full, so the figures are shared too
+        as2.warmup.ready.wait()
+    # Move everything loaded so far out of the collector's reach: a gc pass in a
+    # worker would otherwise write to the object headers and un-share the pages
+    gc.freeze()
+
+
+def on_exit(server):
+    """Remove the SHARED_STORE segments once the last worker is gone."""
+    if os.environ.get('SHARED_STORE'):
+        from shared_store import unlink
+        name = os.environ['SHARED_STORE']
+        unlink(name + '-cube', name + '-cube-claim', name + '-views')
@@ -0,0 +1,139 @@
+import contextvars
+import functools
+import threading
+import time
+
+from flask import g, has_request_context
+
+# Upper bounds (seconds) of the latency histogram buckets; callback phases
+# are mostly well under a millisecond once the figures are cached
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+           0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# Phase timings of the callback running in the current thread, if any
+_current = contextvars.ContextVar('dash_callback_phases', default=None)
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram in the Prometheus model."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+
+
+def _labels(labels):
+    return ','.join('{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"'))
+                    for name, value in labels)
+
+
+class CallbackMetrics:
+    """Per-callback, per-phase latency histograms served as Prometheus text.
+
+    callback() wraps a Dash callback; inside it, phase(name) blocks add their
+    time to that request's phase totals, which are observed once when the
+    callback returns. Serialization happens after the callback, inside Dash,
+    so it is taken from the ResponsePipeline timing in an after_request hook.
+    Phases a request never entered (e.g. on a figure cache hit) are not
+    observed for it. Counters from other components can be added with
+    counter(); each process keeps its own numbers.
+    """
+
+    def __init__(self, server, buckets=BUCKETS):
+        self.buckets = buckets
+        self._histograms = {}
+        self._counters = []
+        self._lock = threading.Lock()
+        server.after_request(self._after_request)
+
+    def _observe(self, callback, phase, seconds):
+        key = (callback, phase)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def callback(self, fn):
+        """Decorator recording the phases (and total time) of one callback."""
+        @functools.wraps(fn)
+        def timed_callback(*args, **kwargs):
+            phases = {}
+            token = _current.set(phases)
+            if has_request_context():
+                g.dash_callback = fn.__name__
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                phases['total'] = time.perf_counter() - start
+                _current.reset(token)
+                for phase, seconds in phases.items():
+                    self._observe(fn.__name__, phase, seconds)
+        return timed_callback
+
+    @staticmethod
+    def phase(name):
+        """Context manager timing one phase of the current callback."""
+        return _Phase(name)
+
+    def _after_request(self, response):
+        callback = g.get('dash_callback')
+        if callback is not None:
+            self._observe(callback, 'serialization', g.get('serialize_seconds', 0.0))
+        return response
+
+    def counter(self, name, help_text, read):
+        """Export read() (a number, or {label value: number}) as a counter."""
+        self._counters.append((name, help_text, read))
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format (0.0.4)."""
+        lines = ['# HELP dash_callback_phase_seconds Time spent in each phase of a Dash callback.',
+                 '# TYPE dash_callback_phase_seconds histogram']
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            snapshot = [(key, list(h.counts), h.count, h.sum) for key, h in histograms]
+        for (callback, phase), counts, count, total in snapshot:
+            labels = [('callback', callback), ('phase', phase)]
+            for bound, n in zip(self.buckets, counts):
+                lines.append('dash_callback_phase_seconds_bucket{{{}}} {}'.format(
+                    _labels(labels + [('le', repr(bound))]), n))
+            lines.append('dash_callback_phase_seconds_bucket{{{}}} {}'.format(
+                _labels(labels + [('le', '+Inf')]), count))
+            lines.append('dash_callback_phase_seconds_sum{{{}}} {!r}'.format(_labels(labels), total))
+            lines.append('dash_callback_phase_seconds_count{{{}}} {}'.format(_labels(labels), count))
+        for name, help_text, read in self._counters:
+            lines.append('# HELP {} {}'.format(name, help_text))
+            lines.append('# TYPE {} counter'.format(name))
+            value = read()
+            if isinstance(value, dict):
+                for label, n in sorted(value.items()):
+                    lines.append('{}{{{}}} {}'.format(name, _labels([('kind', label)]), n))
+            else:
+                lines.append('{} {}'.format(name, value))
+        return '\n'.join(lines) + '\n'
+
+
+class _Phase:
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        phases = _current.get()
+        if phases is not None:
+            phases[self.name] = phases.get(self.name, 0.0) + time.perf_counter() - self.start
+        return False
@@ -0,0 +1,125 @@
+import gzip
+import threading
+import time
+
+import plotly.io.json as pio_json
+from flask import g, has_request_context, request
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+try:
+    import orjson  # noqa: F401  (only checked for availability)
+except ImportError:
+    orjson = None
+
+
+def _gzip(data, level):
+    return gzip.compress(data, compresslevel=level)
+
+
+def _brotli(data, level):
+    return brotli.compress(data, quality=min(level, 11))
+
+
+COMPRESSORS = {'gzip': _gzip}
+if brotli is not None:
+    COMPRESSORS['br'] = _brotli
+
+
+def accepted_encodings(header):
+    """Encodings the client accepts, from an Accept-Encoding header (q=0 excluded)."""
+    accepted = set()
+    for part in (header or '').split(','):
+        name, _, params = part.strip().partition(';')
+        quality = 1.0
+        if params.strip().startswith('q='):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                pass
+        if name and quality > 0:
+            accepted.add(name.lower())
+    return accepted
+
+
+class ResponsePipeline:
+    """JSON encoding and compression for the Dash server's responses.
+
+    Figure/callback JSON is produced by plotly's to_json_plotly, which Dash
+    imports on every call, so the encoder engine is switched (orjson when
+    installed) and timed there. Responses are then compressed with the first
+    of encodings the client accepts. Each response reports its serialization
+    time and byte counts in Server-Timing / X-Uncompressed-Length headers,
+    and stats() keeps running totals.
+    """
+
+    def __init__(self, server, json_engine='orjson', encodings=('br', 'gzip'),
+                 min_size=500, level=6):
+        self.encodings = [name for name in encodings if name in COMPRESSORS]
+        self.min_size = min_size
+        self.level = level
+        self.json_engine = json_engine if (json_engine != 'orjson' or orjson) else 'json'
+        pio_json.config.default_engine = self.json_engine
+        self._lock = threading.Lock()
+        self._totals = {'responses': 0, 'serialize_seconds': 0.0, 'compress_seconds': 0.0,
+                        'raw_bytes': 0, 'sent_bytes': 0}
+        self._by_encoding = {}
+        self._wrap_encoder()
+        server.after_request(self._after_request)
+
+    def _wrap_encoder(self):
+        encode = getattr(pio_json.to_json_plotly, '__wrapped__', pio_json.to_json_plotly)
+
+        def timed_to_json_plotly(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return encode(*args, **kwargs)
+            finally:
+                if has_request_context():
+                    g.serialize_seconds = g.get('serialize_seconds', 0.0) + time.perf_counter() - start
+
+        timed_to_json_plotly.__wrapped__ = encode
+        pio_json.to_json_plotly = timed_to_json_plotly
+
+    def _after_request(self, response):
+        if response.direct_passthrough or response.status_code != 200:
+            return response
+        body = response.get_data()
+        raw_bytes = len(body)
+        encoding = None
+        compress_seconds = 0.0
+        if raw_bytes >= self.min_size and 'Content-Encoding' not in response.headers:
+            accepted = accepted_encodings(request.headers.get('Accept-Encoding'))
+            encoding = next((name for name in self.encodings if name in accepted), None)
+        if encoding:
+            start = time.perf_counter()
+            body = COMPRESSORS[encoding](body, self.level)
+            compress_seconds = time.perf_counter() - start
+            response.set_data(body)
+            response.headers['Content-Encoding'] = encoding
+        if raw_bytes >= self.min_size:
+            response.vary.add('Accept-Encoding')
+        serialize_seconds = g.get('serialize_seconds', 0.0)
+        response.headers['Server-Timing'] = 'serialize;dur={:.3f}, compress;dur={:.3f}'.format(
+            serialize_seconds * 1e3, compress_seconds * 1e3)
+        response.headers['X-Uncompressed-Length'] = str(raw_bytes)
+        with self._lock:
+            totals = self._totals
+            totals['responses'] += 1
+            totals['serialize_seconds'] += serialize_seconds
+            totals['compress_seconds'] += compress_seconds
+            totals['raw_bytes'] += raw_bytes
+            totals['sent_bytes'] += len(body)
+            key = encoding or 'identity'
+            self._by_encoding[key] = self._by_encoding.get(key, 0) + 1
+        return response
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._totals)
+            stats['json_engine'] = self.json_engine
+            stats['encodings'] = dict(self._by_encoding)
+        return stats
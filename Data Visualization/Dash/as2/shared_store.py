@@ -0,0 +1,283 @@
+import hashlib
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from wildfire_data import WildfireCube
+
+# Named shared-memory segments read by every dashboard worker process, so
+# the aggregate cube and the rendered views exist once per machine instead
+# of once per worker. Both segments start with a versioned header; the magic
+# (segment kind + layout version) is written last, so a reader never sees a
+# half-written segment.
+
+CUBE_MAGIC = b'WFCUBE\x00\x01'
+CUBE_HEADER = struct.Struct('<8sQQ')  # magic, data version, metadata length
+CUBE_ARRAYS = ('sums', 'counts', 'cum_sums', 'cum_counts')
+STORE_MAGIC = b'WFVIEW\x00\x01'
+STORE_HEADER = struct.Struct('<8sII')  # magic, slots, slot size
+SLOT_HEADER = struct.Struct('<QQII')  # key hash, data version, length, crc32
+ALIGN = 64
+
+# Segments opened by this process, kept so the numpy views stay valid;
+# mappings of segments since unlinked or replaced are retired, not closed
+_segments = {}
+_retired = []
+
+
+class SegmentNotReady(Exception):
+    """The segment exists but its creator has not sized it yet (or died first)."""
+
+
+def _open(name, size=0, keep=True):
+    """Create (size > 0) or attach to a segment, outside the resource tracker.
+
+    The tracker would unlink the segment when the process that opened it
+    exits, taking it away from the other workers; unlink() removes it.
+    keep=False leaves it to the caller to _keep() or close it. Attaching to
+    a segment that is still empty raises SegmentNotReady.
+    """
+    try:
+        shm = shared_memory.SharedMemory(name=name, create=size > 0, size=size)
+    except ValueError:
+        # mmap of the 0-byte file between the creator's shm_open and ftruncate
+        raise SegmentNotReady(name) from None
+    if os.name == 'posix':
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    if keep:
+        _keep(name, shm)
+    return shm
+
+
+def _keep(name, shm):
+    if name in _segments:
+        _retired.append(_segments[name])
+    _segments[name] = shm
+
+
+def unlink(*names):
+    """Remove segments by name, e.g. from the gunicorn master on exit."""
+    for name in names:
+        shm = _segments.pop(name, None)
+        try:
+            if shm is None:
+                shm = shared_memory.SharedMemory(name=name)
+            elif os.name == 'posix':
+                # SharedMemory.unlink() unregisters it from the tracker again
+                resource_tracker.register(shm._name, 'shared_memory')
+        except FileNotFoundError:
+            continue
+        except ValueError:
+            # Never sized (its creator died right after creating it): cannot
+            # be mapped, so remove the name directly
+            if os.name == 'posix':
+                try:
+                    shared_memory._posixshmem.shm_unlink('/' + name)
+                except FileNotFoundError:
+                    pass
+            continue
+        try:
+            shm.close()
+        except BufferError:
+            _retired.append(shm)  # numpy views still point into it
+        shm.unlink()
+
+
+def publish_cube(cube, name):
+    """Copy a WildfireCube's arrays into a new segment. False if it exists."""
+    arrays = [np.ascontiguousarray(getattr(cube, attr)) for attr in CUBE_ARRAYS]
+    offset, layout = 0, []
+    for attr, arr in zip(CUBE_ARRAYS, arrays):
+        layout.append({'name': attr, 'dtype': arr.dtype.str, 'shape': arr.shape, 'offset': offset})
+        offset += -(-arr.nbytes // ALIGN) * ALIGN
+    meta = json.dumps({'regions': cube.regions, 'years': cube.years, 'arrays': layout}).encode()
+    start = -(-(CUBE_HEADER.size + len(meta)) // ALIGN) * ALIGN
+    try:
+        shm = _open(name, start + offset)
+    except FileExistsError:
+        return False
+    shm.buf[CUBE_HEADER.size:CUBE_HEADER.size + len(meta)] = meta
+    for spec, arr in zip(layout, arrays):
+        view = np.ndarray(arr.shape, arr.dtype, buffer=shm.buf, offset=start + spec['offset'])
+        view[...] = arr
+    CUBE_HEADER.pack_into(shm.buf, 0, b'\x00' * 8, cube.version, len(meta))
+    shm.buf[:8] = CUBE_MAGIC
+    return True
+
+
+def attach_cube(name, timeout=0, version=None):
+    """WildfireCube whose arrays are read-only views of a published segment.
+
+    Waits up to timeout seconds for the segment to be published; returns
+    None if it is not there by then, or if version is given and the segment
+    holds another data version (e.g. one left over from an earlier run).
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            shm = _open(name, keep=False)
+            if shm.size >= CUBE_HEADER.size and bytes(shm.buf[:8]) == CUBE_MAGIC:
+                _, published, meta_length = CUBE_HEADER.unpack_from(shm.buf, 0)
+                if version is not None and published != version:
+                    shm.close()
+                    return None
+                break
+            shm.close()
+        except (FileNotFoundError, SegmentNotReady):
+            pass
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(0.1)
+    _keep(name, shm)
+    meta = json.loads(bytes(shm.buf[CUBE_HEADER.size:CUBE_HEADER.size + meta_length]))
+    start = -(-(CUBE_HEADER.size + meta_length) // ALIGN) * ALIGN
+    views = {}
+    for spec in meta['arrays']:
+        view = np.ndarray(tuple(spec['shape']), np.dtype(spec['dtype']), buffer=shm.buf,
+                          offset=start + spec['offset'])
+        view.flags.writeable = False
+        views[spec['name']] = view
+    return WildfireCube(meta['regions'], meta['years'], views['sums'], views['counts'],
+                        version=published, cum_sums=views['cum_sums'], cum_counts=views['cum_counts'])
+
+
+def shared_cube(name, version, build, timeout=120):
+    """The cube of data version from segment name, built and published if needed.
+
+    Of the processes asking for a version that is not published yet, the one
+    that creates the <name>-claim segment calls build() and replaces the
+    segment (unlinking a previous version's or a half-written one); the rest
+    wait up to timeout seconds and attach. A claim whose holder died is taken
+    over after the timeout. version None accepts whatever is published.
+    """
+    claim = name + '-claim'
+    deadline = time.monotonic() + timeout
+    while True:
+        cube = attach_cube(name, version=version)
+        if cube is not None:
+            return cube
+        try:
+            _open(claim, 8)
+        except FileExistsError:
+            if time.monotonic() < deadline:
+                time.sleep(0.1)
+                continue
+            unlink(claim)
+            deadline = time.monotonic() + timeout
+            continue
+        try:
+            cube = build()
+            unlink(name)
+            publish_cube(cube, name)
+        finally:
+            unlink(claim)
+        return attach_cube(name, version=cube.version) or cube
+
+
+class SharedFigureStore:
+    """Fixed-size hash table of serialized view results in shared memory.
+
+    Keys are strings, values are bytes tagged with the data version they were
+    built from; get() ignores other versions and put() reuses their slots, so
+    a data reload invalidates the whole store without clearing it. Writers
+    do not lock: a slot is marked empty while it is rewritten and carries a
+    crc32 seeded with its key hash, so a reader racing a writer (or two
+    writers racing each other) sees a miss, never a torn or foreign value.
+    created is True in the one process that made the segment.
+    """
+
+    def __init__(self, name, slots=2048, slot_size=2048, probes=8, timeout=10):
+        self.name = name
+        self.probes = probes
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.rejected = 0
+        while True:
+            try:
+                self._shm = _open(name, STORE_HEADER.size + slots * slot_size)
+                self.created = True
+                STORE_HEADER.pack_into(self._shm.buf, 0, b'\x00' * 8, slots, slot_size)
+                self._shm.buf[:8] = STORE_MAGIC
+                break
+            except FileExistsError:
+                pass
+            self.created = False
+            self._shm = self._attach_ready(timeout)
+            if self._shm is not None:
+                break
+            # Gone, or its creator died before sizing it or writing the header:
+            # start over
+            unlink(name)
+        _, self.slots, self.slot_size = STORE_HEADER.unpack_from(self._shm.buf, 0)
+
+    def _attach_ready(self, timeout):
+        """The segment once its header is written; None if it is not by the timeout."""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                shm = _open(self.name, keep=False)
+            except FileNotFoundError:
+                return None
+            except SegmentNotReady:
+                pass
+            else:
+                if shm.size >= STORE_HEADER.size and bytes(shm.buf[:8]) == STORE_MAGIC:
+                    _keep(self.name, shm)
+                    return shm
+                shm.close()
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(0.01)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+        key_hash = int.from_bytes(digest, 'little') | 1  # 0 marks an empty slot
+        for i in range(self.probes):
+            yield key_hash, STORE_HEADER.size + (key_hash + i) % self.slots * self.slot_size
+
+    def get(self, key, version):
+        buf = self._shm.buf
+        for key_hash, pos in self._positions(key):
+            slot_hash, slot_version, length, crc = SLOT_HEADER.unpack_from(buf, pos)
+            if slot_hash == key_hash and slot_version == version:
+                start = pos + SLOT_HEADER.size
+                value = bytes(buf[start:start + length])
+                if zlib.crc32(value, key_hash & 0xffffffff) == crc and SLOT_HEADER.unpack_from(buf, pos)[0] == key_hash:
+                    self.hits += 1
+                    return value
+        self.misses += 1
+        return None
+
+    def put(self, key, version, value):
+        """Store value; False when it does not fit a slot or no slot is free."""
+        if SLOT_HEADER.size + len(value) > self.slot_size:
+            self.rejected += 1
+            return False
+        buf = self._shm.buf
+        for key_hash, pos in self._positions(key):
+            slot_hash, slot_version, _, _ = SLOT_HEADER.unpack_from(buf, pos)
+            if slot_hash in (0, key_hash) or slot_version != version:
+                SLOT_HEADER.pack_into(buf, pos, 0, 0, 0, 0)
+                start = pos + SLOT_HEADER.size
+                buf[start:start + len(value)] = value
+                SLOT_HEADER.pack_into(buf, pos, 0, version, len(value),
+                                      zlib.crc32(value, key_hash & 0xffffffff))
+                buf[pos:pos + 8] = key_hash.to_bytes(8, 'little')
+                self.stores += 1
+                return True
+        self.rejected += 1
+        return False
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {'name': self.name, 'slots': self.slots, 'slot_size': self.slot_size,
+                'hits': self.hits, 'misses': self.misses, 'stores': self.stores,
+                'rejected': self.rejected, 'hit_ratio': self.hits / lookups if lookups else 0.0}
@@ -0,0 +1,45 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Warmup:
+    """Renders every (region, year) view on a background thread pool.
+
+    ready is set once all views have been attempted; failures are counted
+    but do not stop the rest of the warm-up.
+    """
+
+    def __init__(self, regions, years, render, workers=4):
+        self.views = [(region, year) for region in regions for year in years]
+        self.render = render
+        self.workers = workers
+        self.ready = threading.Event()
+        self.done = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+
+    def start(self):
+        threading.Thread(target=self._run, name='figure-warmup', daemon=True).start()
+        return self
+
+    def _render_one(self, view):
+        try:
+            self.render(*view)
+        except Exception:
+            with self._lock:
+                self.failed += 1
+        finally:
+            with self._lock:
+                self.done += 1
+
+    def _run(self):
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                list(pool.map(self._render_one, self.views))
+        finally:
+            self.ready.set()
+
+    def status(self):
+        with self._lock:
+            return {'ready': self.ready.is_set(), 'views': len(self.views),
+                    'done': self.done, 'failed': self.failed}
@@ -6,25 +6,20 @@ import folium
 import io
 import requests
 import datetime as dt
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aggregate import fused_groupby, grouped_moments
+from wildfire_data import build_partition_index, load_wildfires
 
 
 # Define the file name
 file_name = "Historical_Wildfires.csv"
 
-# Define the headers (assuming you want to set custom headers)
-headers = [
-    "Region", "Date", 
-    "Estimated_fire_area", 
-    "Mean_estimated_fire_brightness", 
-    "Mean_estimated_fire_radiative_power", 
-    "Mean_confidence", 
-    "Std_confidence", 
-    "Var_confidence", 
-    "Count", "Replaced"
-]
-
-# Load the CSV file
-df = pd.read_csv(file_name, names=headers)
+# Load the data as a typed frame (float32 measures, categorical Region,
+# int16 Year, int8 Month, datetime64 Date). The CSV is converted once into
+# Historical_Wildfires.npz next to it and that snapshot is loaded afterwards.
+df = load_wildfires(os.path.join(os.path.dirname(os.path.abspath(__file__)), file_name))
 
 # Display the first few rows of the DataFrame
 print("DataFrame Head:")
@@ -38,37 +33,26 @@ print(df.columns)
 print("\nData Types:")
 print(df.dtypes)
 
-# Ensure 'Estimated_fire_area' is numeric
-df['Estimated_fire_area'] = pd.to_numeric(df['Estimated_fire_area'], errors='coerce') #type conversion
-
-# Check if the 'Date' column exists and try converting it to datetime
-if 'Date' in df.columns:
-    try:
-        # Attempt to convert 'Date' column to datetime
-        df['Date'] = pd.to_datetime(df['Date'], errors='coerce')  # Convert, setting errors to NaT for invalid parsing
-        
-        # Extract year and month, handling any NaT values gracefully
-        df['Year'] = df['Date'].dt.year  # Type conversion
-        df['Month'] = df['Date'].dt.month  # Type conversion
-        
-        # Display to verify
-        print("Year and Month columns added:")
-        print(df[['Date', 'Year', 'Month']].head())
-    except Exception as e:
-        print(f"Error converting 'Date' column: {e}")
-else:
-    print("The 'Date' column is missing in the DataFrame.")
+# 'Estimated_fire_area' is already numeric and Year/Month are already
+# extracted from 'Date' by the loader
+print("Year and Month columns:")
+print(df[['Date', 'Year', 'Month']].head())
 
 # Display the data types of each column again to verify
-print("\nData Types after conversions:")
+print("\nData Types after loading:")
 print(df.dtypes)
 
+# Sort by Region/Year/Date and index the partitions; each region is then one
+# contiguous slice that the per-region analyses below can reduce directly
+index = build_partition_index(df)
+df = index.df
+
 # TASK 1.1: Plotting the change in average estimated fire area over time
 
 plt.figure(figsize=(12, 6))
 
 # Group the data by 'Year' and calculate the mean of 'Estimated_fire_area'
-df_new = df.groupby('Year')['Estimated_fire_area'].mean()
+df_new = fused_groupby(df, ['Year'], {'Estimated_fire_area': ('Estimated_fire_area', 'mean')})['Estimated_fire_area']
 
 # Plot the data
 df_new.plot()  # Index will be used for x-axis, and values for y-axis
@@ -78,7 +62,7 @@ plt.title('Estimated Fire Area over Time')
 plt.show()
 #TASK 1.2: You can notice the peak in the plot between 2010 to 2013. Let's narrow down our finding, by plotting the estimated fire area for year grouped together with month.
 # Grouping the data by both 'Year' and 'Month', and calculating the mean of 'Estimated_fire_area'
-df_new = df.groupby(['Year','Month'])['Estimated_fire_area'].mean()
+df_new = fused_groupby(df, ['Year','Month'], {'Estimated_fire_area': ('Estimated_fire_area', 'mean')})['Estimated_fire_area']
     # Plotting the data
 df_new.plot(x=df_new.index, y=df_new.values)
 plt.xlabel('Year, Month')
@@ -103,11 +87,8 @@ plt.show()
 # Creating a pie chart to visualize the portion of count of pixels for presumed vegetation fires across regions
 
 
-# Converting the 'Count' column to numeric, replacing non-numeric values with NaN, and then filling NaNs with 0
-df['Count'] = pd.to_numeric(df['Count'], errors='coerce').fillna(0)
-
-# Grouping the data by region and summing the counts
-region_counts = df.groupby('Region')['Count'].sum()
+# Summing the counts per region over the contiguous region slices
+region_counts = index.region_sums('Count')
 
 # Plotting the pie chart
 plt.figure(figsize=(10, 6))
@@ -156,6 +137,13 @@ plt.ylabel('Mean Confidence')
 plt.title('Mean Estimated Fire Radiative Power vs. Mean Confidence')
 plt.show()
 
+# Each row summarises the confidence of Count pixels (mean, std, var), so the
+# per-region statistics merge those (n, mean, M2) moments count-weighted
+# instead of averaging the daily means
+confidence_by_region = grouped_moments(df, ['Region'])
+print("\nCount-weighted pixel confidence by region:")
+print(confidence_by_region[['n', 'mean', 'std']])
+
 #breakpoint()
 
 #ASK 1.9: Let's mark these seven regions on the Map of Australia using Folium
@@ -0,0 +1,56 @@
+import pandas as pd
+
+from dateparse import parse_dates
+
+# Typed loader for historical_automobile_sales.csv (final assignment1).
+
+AUTOMOBILE_HEADERS = [
+    "Date", "Year", "Month", "Recession", "Consumer_Confidence", "Seasonality_Weight",
+    "Price", "Advertising_Expenditure", "Competition", "GDP", "Growth_Rate", "unemployment_rate",
+    "Automobile_Sales", "Vehicle_Type", "City"
+]
+MONTH_ABBR = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+# String columns are dictionary encoded, so filters and groupbys on them work
+# on small integer codes instead of comparing Python strings.
+# Numeric columns are coerced with errors='coerce' first, so every column here
+# may hold NaN until the dropna below; the final types are applied afterwards.
+AUTOMOBILE_DTYPES = {
+    'Year': 'int16',
+    'Month': pd.CategoricalDtype(MONTH_ABBR, ordered=True),
+    'Recession': 'bool',
+    'Consumer_Confidence': 'float64',
+    'Seasonality_Weight': 'float64',
+    'Price': 'float64',
+    'Advertising_Expenditure': 'float64',
+    'Competition': 'float64',
+    'GDP': 'float64',
+    'Growth_Rate': 'float64',
+    'unemployment_rate': 'float64',
+    'Automobile_Sales': 'float64',
+    'Vehicle_Type': 'category',
+    'City': 'category',
+}
+# Rows missing any of these cannot be used by the tasks and are dropped once
+REQUIRED_COLUMNS = ['Year', 'Recession', 'Automobile_Sales', 'Vehicle_Type', 'Seasonality_Weight',
+                    'Price', 'Consumer_Confidence', 'GDP', 'Advertising_Expenditure', 'unemployment_rate']
+
+def load_automobile_sales(path):
+    """Load the automobile sales CSV as one analysis-ready frame.
+
+    Numeric and boolean conversion, date parsing and NaN handling happen here
+    once, and every task of a script shares the returned frame. It is
+    read-only by contract: derive new frames (filters, assign, groupby)
+    instead of writing to it. Under copy-on-write (always on from pandas 3,
+    opt-in before that) a derived frame never writes through to the shared
+    one; this module does not change that global option itself.
+    """
+    df = pd.read_csv(path, names=AUTOMOBILE_HEADERS, header=0)
+    dates = parse_dates(df['Date'])
+    df['Date'] = dates['Date']
+    df['Year'] = dates['Year']
+    for col, dtype in AUTOMOBILE_DTYPES.items():
+        if dtype == 'float64':
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    df['Recession'] = pd.to_numeric(df['Recession'], errors='coerce')
+    df = df.dropna(subset=REQUIRED_COLUMNS)
+    return df.astype(AUTOMOBILE_DTYPES).reset_index(drop=True)
@@ -0,0 +1,45 @@
+import os
+import sys
+import timeit
+
+# bincount aggregation engine vs pandas groupby on the groupings the scripts use.
+# Run: python benchmarks/bench_aggregate.py
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(HERE, '..'))
+from aggregate import fused_groupby
+from automobile_data import load_automobile_sales
+from wildfire_data import load_wildfires
+
+WILDFIRE_CSV = os.path.join(HERE, '..', 'assignment1', 'Historical_Wildfires.csv')
+AUTOMOBILE_CSV = os.path.join(HERE, '..', 'final assignment1', 'historical_automobile_sales.csv')
+
+
+def bench(name, df, keys, aggs, number=200):
+    times = {}
+    for engine in ('pandas', 'bincount'):
+        times[engine] = timeit.timeit(lambda: fused_groupby(df, keys, aggs, engine=engine),
+                                      number=number) / number
+    print('{:<52} pandas {:8.1f} us   bincount {:8.1f} us   x{:.1f}'.format(
+        name, times['pandas'] * 1e6, times['bincount'] * 1e6, times['pandas'] / times['bincount']))
+
+
+if __name__ == '__main__':
+    wildfires = load_wildfires(WILDFIRE_CSV)
+    autos = load_automobile_sales(AUTOMOBILE_CSV)
+    area_mean = {'Estimated_fire_area': ('Estimated_fire_area', 'mean')}
+    bench('wildfire Year mean', wildfires, ['Year'], area_mean)
+    bench('wildfire Year, Month mean', wildfires, ['Year', 'Month'], area_mean)
+    bench('wildfire Region, Year, Month sum/count/mean/min/max', wildfires, ['Region', 'Year', 'Month'], {
+        'area_sum': ('Estimated_fire_area', 'sum'),
+        'rows': ('Estimated_fire_area', 'count'),
+        'count_mean': ('Count', 'mean'),
+        'area_min': ('Estimated_fire_area', 'min'),
+        'area_max': ('Estimated_fire_area', 'max'),
+    })
+    sales_mean = {'Automobile_Sales': ('Automobile_Sales', 'mean')}
+    bench('automobile Year mean', autos, ['Year'], sales_mean)
+    bench('automobile Year, Vehicle_Type, Recession mean', autos,
+          ['Year', 'Vehicle_Type', 'Recession'], sales_mean)
+    bench('automobile Recession, Year GDP mean', autos, ['Recession', 'Year'],
+          {'GDP': ('GDP', 'mean')})
@@ -0,0 +1,42 @@
+import os
+import sys
+import timeit
+
+# Memory and filter/groupby time of object-string vs categorical key columns.
+# Run: python benchmarks/bench_categoricals.py
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(HERE, '..'))
+from automobile_data import load_automobile_sales
+from wildfire_data import load_wildfires
+
+WILDFIRE_CSV = os.path.join(HERE, '..', 'assignment1', 'Historical_Wildfires.csv')
+AUTOMOBILE_CSV = os.path.join(HERE, '..', 'final assignment1', 'historical_automobile_sales.csv')
+
+
+def as_strings(df, columns):
+    out = df.copy()
+    for col in columns:
+        out[col] = out[col].astype(object)
+    return out
+
+
+def bench(name, encoded, columns, key, value, measure, number=200):
+    plain = as_strings(encoded, columns)
+    print(name)
+    for label, df in (('object', plain), ('categorical', encoded)):
+        memory = sum(df[col].memory_usage(deep=True) for col in columns)
+        filter_time = timeit.timeit(lambda: df[df[key] == value], number=number) / number
+        group_time = timeit.timeit(
+            lambda: df.groupby(columns, observed=True)[measure].mean(), number=number) / number
+        print('  {:<12} memory {:>10,} B   filter {:8.1f} us   groupby {:8.1f} us'.format(
+            label, memory, filter_time * 1e6, group_time * 1e6))
+
+
+if __name__ == '__main__':
+    wildfires = load_wildfires(WILDFIRE_CSV)
+    bench('wildfire Region ({} rows)'.format(len(wildfires)), wildfires,
+          ['Region'], 'Region', 'NSW', 'Estimated_fire_area')
+    autos = load_automobile_sales(AUTOMOBILE_CSV)
+    bench('automobile Vehicle_Type/City/Month ({} rows)'.format(len(autos)), autos,
+          ['Vehicle_Type', 'City', 'Month'], 'Vehicle_Type', 'Sports', 'Automobile_Sales')
@@ -0,0 +1,42 @@
+import os
+import sys
+import timeit
+
+import plotly.express as px
+
+# Per-call cost of the (pie, bar) pair: plotly.express on every view vs. the
+# FigureFactory skeletons as2 fills in. Both produce the same figure JSON.
+# Run: python benchmarks/bench_figures.py
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(HERE, '..'))
+sys.path.append(os.path.join(HERE, '..', 'as2'))
+from figure_factory import FigureFactory
+from wildfire_data import build_cube, load_wildfires
+
+WILDFIRE_CSV = os.path.join(HERE, '..', 'assignment1', 'Historical_Wildfires.csv')
+
+
+def with_px(month_data):
+    return (px.pie(month_data, values='Estimated_fire_area', names='Month', title='pie'),
+            px.bar(month_data, x='Month', y='Count', title='bar'))
+
+
+def with_factory(factory, month_data):
+    return (factory.pie(month_data['Month'], month_data['Estimated_fire_area'], 'pie'),
+            factory.bar(month_data['Month'], month_data['Count'], 'bar'))
+
+
+if __name__ == '__main__':
+    cube = build_cube(load_wildfires(WILDFIRE_CSV))
+    views = [cube.month_means(region, year) for region in cube.regions for year in cube.years]
+    start = timeit.default_timer()
+    factory = FigureFactory()
+    setup = timeit.default_timer() - start
+    number = 3
+    px_time = timeit.timeit(lambda: [with_px(v) for v in views], number=number) / number / len(views)
+    factory_time = timeit.timeit(lambda: [with_factory(factory, v) for v in views],
+                                 number=number) / number / len(views)
+    print('{} views, skeletons built once in {:.1f} ms'.format(len(views), setup * 1e3))
+    print('  plotly.express   {:7.2f} ms / (pie, bar)'.format(px_time * 1e3))
+    print('  FigureFactory    {:7.2f} ms / (pie, bar)   x{:.1f}'.format(factory_time * 1e3, px_time / factory_time))
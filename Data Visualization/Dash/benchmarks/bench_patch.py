@@ -0,0 +1,51 @@
+import os
+import sys
+import time
+
+from dash import dcc
+from plotly.io.json import to_json_plotly
+
+# Callback response size: Patch of trace data/titles into persistent graphs
+# (current) vs. returning two new dcc.Graph components with full figures.
+# Run: python benchmarks/bench_patch.py   (uses the as2 data cache / URL settings)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(HERE, '..', 'as2'))
+import as2
+
+
+def update_payload(region, year):
+    return {
+        'output': '..graph1.figure...graph2.figure..',
+        'outputs': [{'id': 'graph1', 'property': 'figure'}, {'id': 'graph2', 'property': 'figure'}],
+        'inputs': [{'id': 'region', 'property': 'value', 'value': region},
+                   {'id': 'year', 'property': 'value', 'value': year}],
+        'changedPropIds': ['region.value'],
+    }
+
+
+if __name__ == '__main__':
+    client = as2.app.server.test_client()
+    views = [(region, year) for region in as2.REGIONS for year in as2.YEARS]
+    patch_bytes = full_bytes = 0
+    patch_time = full_time = 0.0
+    for region, year in views:
+        # Render (and cache) the figures first so both sides exclude px time
+        fig1, fig2 = as2.cached_figures(region, year)
+        start = time.perf_counter()
+        response = client.post('/_dash-update-component', json=update_payload(region, year))
+        patch_time += time.perf_counter() - start
+        patch_bytes += len(response.data)
+        start = time.perf_counter()
+        full = to_json_plotly({'response': {
+            'plot1': {'children': dcc.Graph(figure=fig1)},
+            'plot2': {'children': dcc.Graph(figure=fig2)}}, 'multi': True})
+        full_time += time.perf_counter() - start
+        full_bytes += len(full)
+    n = len(views)
+    print('{} views'.format(n))
+    print('  full dcc.Graph children  {:8.0f} B/response   serialize {:6.2f} ms'.format(
+        full_bytes / n, full_time / n * 1e3))
+    print('  Patch of data + titles   {:8.0f} B/response   round trip {:6.2f} ms'.format(
+        patch_bytes / n, patch_time / n * 1e3))
+    # Client re-render time needs a browser; compare in the devtools Performance tab
@@ -0,0 +1,84 @@
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+# Memory per gunicorn worker with the app loaded separately in every worker,
+# preloaded in the master (shared copy-on-write), or attached to the
+# SHARED_STORE shared-memory segments. Linux only (reads
+# /proc/<pid>/smaps_rollup). Uses the as2 data cache / URL settings.
+# Run: python benchmarks/bench_workers.py [workers]
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CONFIG = os.path.join(HERE, '..', 'as2', 'gunicorn.conf.py')
+BIND = '127.0.0.1:8057'
+
+
+def smaps(pid):
+    """Rss, Pss and private (unshared) memory of a process, in kB."""
+    values = {}
+    with open('/proc/{}/smaps_rollup'.format(pid)) as f:
+        for line in f:
+            name, _, rest = line.partition(':')
+            if rest.strip().endswith('kB'):
+                values[name] = int(rest.split()[0])
+    return {'rss': values['Rss'], 'pss': values['Pss'],
+            'private': values['Private_Clean'] + values['Private_Dirty']}
+
+
+def children(pid):
+    """Worker pids of the gunicorn master (skips e.g. the resource tracker)."""
+    with open('/proc/{}/task/{}/children'.format(pid, pid)) as f:
+        pids = [int(child) for child in f.read().split()]
+    workers = []
+    for child in pids:
+        with open('/proc/{}/cmdline'.format(child), 'rb') as f:
+            if b'gunicorn' in f.read():
+                workers.append(child)
+    return workers
+
+
+def measure(label, workers, preload=False, shared=None, requests=200):
+    env = dict(os.environ, PRELOAD='1' if preload else '0', WEB_CONCURRENCY=str(workers), BIND=BIND)
+    if shared:
+        env['SHARED_STORE'] = shared
+    master = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', CONFIG, 'as2:server'],
+                              env=env, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.time() + 300
+        while True:
+            try:
+                urllib.request.urlopen('http://{}/ready'.format(BIND), timeout=5)
+                if len(children(master.pid)) == workers:
+                    break
+            except OSError:
+                pass
+            if time.time() > deadline:
+                raise RuntimeError('gunicorn did not start')
+            time.sleep(0.5)
+        # Touch every worker with a few requests so lazily built state is counted
+        for _ in range(requests):
+            urllib.request.urlopen('http://{}/_dash-layout'.format(BIND)).read()
+        master_mem = smaps(master.pid)
+        worker_mem = [smaps(pid) for pid in children(master.pid)]
+    finally:
+        master.terminate()
+        master.wait()
+    n = len(worker_mem)
+    print('{:<26} master pss {:7.1f} MB   worker rss {:7.1f} MB  pss {:7.1f} MB  private {:7.1f} MB'
+          '   total pss {:7.1f} MB'.format(
+              label, master_mem['pss'] / 1024,
+              sum(m['rss'] for m in worker_mem) / n / 1024,
+              sum(m['pss'] for m in worker_mem) / n / 1024,
+              sum(m['private'] for m in worker_mem) / n / 1024,
+              (master_mem['pss'] + sum(m['pss'] for m in worker_mem)) / 1024))
+
+
+if __name__ == '__main__':
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    print('{} workers'.format(workers))
+    measure('loaded per worker', workers)
+    measure('preloaded (copy-on-write)', workers, preload=True)
+    measure('shared memory store', workers, shared='bench-wildfire')
+    measure('preloaded + shared store', workers, preload=True, shared='bench-wildfire')
@@ -0,0 +1,194 @@
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import numpy as np
+
+# Load generator for the region/year callback (reg_year_display). Virtual
+# users replay selection sequences against /_dash-update-component, either
+# in-process through the Flask test client or over HTTP against a running
+# server (python as2.py, or gunicorn -c as2/gunicorn.conf.py as2:server).
+# The regions and years replayed are the ones the target offers: as2's own
+# in-process, the served /_dash-layout over HTTP, unless --regions / --years
+# are given.
+# Run: python benchmarks/load_test.py [--url http://127.0.0.1:8050] [-c 8] [-n 2000]
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# The dashboard's initial view; sessions start there when it is offered
+DEFAULT_VIEW = ('NSW', 2005)
+
+
+def update_payload(region, year, changed):
+    return {
+        'output': '..graph1.figure...graph2.figure..',
+        'outputs': [{'id': 'graph1', 'property': 'figure'}, {'id': 'graph2', 'property': 'figure'}],
+        'inputs': [{'id': 'region', 'property': 'value', 'value': region},
+                   {'id': 'year', 'property': 'value', 'value': year}],
+        'changedPropIds': [changed + '.value'],
+    }
+
+
+def session(rng, steps, regions, years):
+    """One user's selections: the default view, then mostly small moves.
+
+    Users step to the next/previous year most of the time, switch region
+    now and then and occasionally jump to an arbitrary year.
+    """
+    region = DEFAULT_VIEW[0] if DEFAULT_VIEW[0] in regions else regions[0]
+    y = years.index(DEFAULT_VIEW[1]) if DEFAULT_VIEW[1] in years else 0
+    yield region, years[y], 'year'
+    for _ in range(steps - 1):
+        move = rng.random()
+        if move < 0.6:
+            y = min(max(y + rng.choice((-1, 1)), 0), len(years) - 1)
+            yield region, years[y], 'year'
+        elif move < 0.9 and len(regions) > 1:
+            region = rng.choice([r for r in regions if r != region])
+            yield region, years[y], 'region'
+        else:
+            y = rng.randrange(len(years))
+            yield region, years[y], 'year'
+
+
+def _option_values(options):
+    return [option['value'] if isinstance(option, dict) else option for option in options]
+
+
+def layout_views(layout):
+    """(regions, years) offered by the 'region' and 'year' components of a Dash layout."""
+    found = {}
+
+    def walk(node):
+        if isinstance(node, dict):
+            props = node.get('props', {})
+            if props.get('id') in ('region', 'year'):
+                found[props['id']] = _option_values(props.get('options', []))
+            for value in node.values():
+                walk(value)
+        elif isinstance(node, list):
+            for value in node:
+                walk(value)
+    walk(layout)
+    return found.get('region', []), found.get('year', [])
+
+
+def http_views(url):
+    with urllib.request.urlopen(url.rstrip('/') + '/_dash-layout', timeout=30) as response:
+        return layout_views(json.load(response))
+
+
+def in_process_views():
+    import as2
+    return list(as2.REGIONS), list(as2.versions.current.cube.years)
+
+
+def parse_years(text):
+    """'2005-2020' or '2005,2007,2010' (or a mix) as a list of years."""
+    years = []
+    for part in text.split(','):
+        start, _, end = part.partition('-')
+        years.extend(range(int(start), int(end or start) + 1))
+    return years
+
+
+def http_sender(url):
+    endpoint = url.rstrip('/') + '/_dash-update-component'
+
+    def send(payload):
+        request = urllib.request.Request(endpoint, data=json.dumps(payload).encode(),
+                                         headers={'Content-Type': 'application/json',
+                                                  'Accept-Encoding': 'gzip'})
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+    return send
+
+
+def in_process_sender():
+    import as2
+    local = threading.local()
+
+    def send(payload):
+        if not hasattr(local, 'client'):
+            local.client = as2.app.server.test_client()
+        return local.client.post('/_dash-update-component', json=payload).status_code
+    return send
+
+
+def run(send, concurrency, requests, steps, seed, regions, years):
+    latencies = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+    per_user = [requests // concurrency + (i < requests % concurrency) for i in range(concurrency)]
+    start_line = threading.Barrier(concurrency + 1)
+
+    def user(i):
+        rng = random.Random(seed + i)
+        start_line.wait()
+        sent = 0
+        while sent < per_user[i]:
+            for region, year, changed in session(rng, steps, regions, years):
+                if sent == per_user[i]:
+                    break
+                start = time.perf_counter()
+                try:
+                    ok = send(update_payload(region, year, changed)) == 200
+                except Exception:
+                    ok = False
+                latencies[i].append(time.perf_counter() - start)
+                errors[i] += not ok
+                sent += 1
+
+    threads = [threading.Thread(target=user, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    start_line.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return np.concatenate([np.array(l) for l in latencies]), sum(errors), elapsed
+
+
+def report(latencies, errors, elapsed, label):
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1e3
+    print('{:<28} {:6d} req  {:8.1f} req/s   p50 {:7.2f} ms  p95 {:7.2f} ms  p99 {:7.2f} ms'
+          '   errors {:.2%}'.format(label, len(latencies), len(latencies) / elapsed,
+                                    p50, p95, p99, errors / len(latencies)))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', help='server to load, e.g. http://127.0.0.1:8050 '
+                                      '(default: as2 in-process via the test client)')
+    parser.add_argument('-c', '--concurrency', type=int, default=8, help='virtual users')
+    parser.add_argument('-n', '--requests', type=int, default=2000, help='total requests')
+    parser.add_argument('--steps', type=int, default=20, help='selections per user session')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--regions', help='comma-separated regions (default: those the target offers)')
+    parser.add_argument('--years', help="e.g. 2005-2020 or 2005,2010 (default: those the target offers)")
+    args = parser.parse_args()
+    if args.url:
+        send = http_sender(args.url)
+        regions, years = http_views(args.url)
+    else:
+        sys.path.append(os.path.join(HERE, '..', 'as2'))
+        send = in_process_sender()
+        regions, years = in_process_views()
+    if args.regions:
+        regions = args.regions.split(',')
+    if args.years:
+        years = parse_years(args.years)
+    if not regions or not years:
+        parser.error('no regions/years to replay; pass --regions and --years')
+    latencies, errors, elapsed = run(send, args.concurrency, args.requests, args.steps, args.seed,
+                                     regions, years)
+    report(latencies, errors, elapsed, '{} x{}'.format(args.url or 'in-process', args.concurrency))
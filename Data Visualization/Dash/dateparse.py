@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+# Date parsing shared by the wildfire and automobile loaders. Both files use
+# m/d/yyyy strings and repeat each date many times (a few thousand distinct
+# dates over 26k wildfire rows), so each distinct string is parsed only once.
+
+DATE_FORMAT = '%m/%d/%Y'
+
+
+def parse_dates(dates, format=DATE_FORMAT):
+    """Parse a column of date strings with an explicit format.
+
+    Returns a frame aligned with dates holding Date (datetime64), Year,
+    Month (1-12) and Month_name, all derived in the same pass. Unparseable
+    or missing values become NaT/NaN.
+    """
+    codes, uniques = pd.factorize(dates)
+    parsed = pd.to_datetime(pd.Index(uniques), format=format, errors='coerce')
+    # Position len(uniques) is a NaT sentinel for missing values (code -1)
+    parsed = parsed.append(pd.DatetimeIndex([pd.NaT]))
+    codes = np.where(codes < 0, len(uniques), codes)
+    index = dates.index if isinstance(dates, pd.Series) else None
+    return pd.DataFrame({
+        'Date': parsed.to_numpy()[codes],
+        'Year': parsed.year.to_numpy()[codes],
+        'Month': parsed.month.to_numpy()[codes],
+        'Month_name': parsed.month_name().to_numpy()[codes],
+    }, index=index)
@@ -2,30 +2,19 @@ import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
-
-# Load the CSV file with predefined headers
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aggregate import fused_groupby
+from automobile_data import load_automobile_sales
+
+# Load the CSV once: the loader does numeric/boolean conversion, date parsing
+# and NaN handling, and every task below shares the resulting frame
 file_name = "historical_automobile_sales.csv"
-headers = [
-    "Date", "Year", "Month", "Recession", "Consumer_Confidence", "Seasonality_Weight",
-    "Price", "Advertising_Expenditure", "Competition", "GDP", "Growth_Rate", "unemployment_rate",
-    "Automobile_Sales", "Vehicle_Type", "City"
-]
-
-df = pd.read_csv(file_name, names=headers, header=0)
-
-# Convert necessary columns to numeric, with error handling and drop NaNs
-numeric_columns = ['Year', 'Automobile_Sales', 'Price', 'Advertising_Expenditure', 'GDP', 'Growth_Rate', 'unemployment_rate', 'Consumer_Confidence', 'Seasonality_Weight']
-for col in numeric_columns:
-    df[col] = pd.to_numeric(df[col], errors='coerce')
-
-# Convert Recession to boolean
-df['Recession'] = df['Recession'].astype(bool)
-
-# Drop rows with NaN in essential columns
-df.dropna(subset=['Year', 'Automobile_Sales', 'Vehicle_Type'], inplace=True)
+df = load_automobile_sales(os.path.join(os.path.dirname(os.path.abspath(__file__)), file_name))
 
 # Task 1.1: Line chart of Automobile Sales over the Years
-df_line = df.groupby('Year')['Automobile_Sales'].mean()
+df_line = fused_groupby(df, ['Year'], {'Automobile_Sales': ('Automobile_Sales', 'mean')})['Automobile_Sales']
 plt.figure(figsize=(10, 6))
 df_line.plot(kind='line')
 plt.xlabel('Year')
@@ -35,7 +24,7 @@ plt.grid(True)
 plt.show()
 
 # Task 1.2: Analyze sales trends by Vehicle Type during Recession
-df_grouped = df.groupby(['Year', 'Vehicle_Type', 'Recession'])['Automobile_Sales'].mean().reset_index()
+df_grouped = fused_groupby(df, ['Year', 'Vehicle_Type', 'Recession'], {'Automobile_Sales': ('Automobile_Sales', 'mean')}).reset_index()
 
 plt.figure(figsize=(12, 8))
 for vehicle_type in df['Vehicle_Type'].unique():
@@ -76,11 +65,10 @@ plt.tight_layout()
 plt.show()
 
 # Task 1.4: Subplots to compare GDP during recession and non-recession periods
-df.dropna(subset=['GDP'], inplace=True)
-
-# Separate the data for recession and non-recession periods
-df_recession = df[df['Recession']].groupby('Year')['GDP'].mean().reset_index()
-df_non_recession = df[~df['Recession']].groupby('Year')['GDP'].mean().reset_index()
+# Mean GDP per (Recession, Year) in one grouping, then split into the two periods
+gdp_by_period = fused_groupby(df, ['Recession', 'Year'], {'GDP': ('GDP', 'mean')}).reset_index()
+df_recession = gdp_by_period[gdp_by_period['Recession']]
+df_non_recession = gdp_by_period[~gdp_by_period['Recession']]
 
 fig, axes = plt.subplots(1, 2, figsize=(14, 6), sharey=True)
 axes[0].plot(df_recession['Year'], df_recession['GDP'], color='red', marker='o')
@@ -99,7 +87,6 @@ plt.tight_layout(rect=[0, 0.03, 1, 0.95])
 plt.show()
 
 # Task 1.5: Bubble plot for the impact of seasonality on Automobile Sales
-df.dropna(subset=['Seasonality_Weight'], inplace=True)
 plt.figure(figsize=(10, 6))
 bubble_sizes = df['Automobile_Sales'] / 100  # Scale bubble sizes
 plt.scatter(df['Seasonality_Weight'], df['Automobile_Sales'], s=bubble_sizes, alpha=0.5, color='blue', edgecolor='k')
@@ -131,9 +118,9 @@ plt.grid(True)
 plt.show()
 
 # Task 1.7: Pie chart for advertising expenditure during recession and non-recession
-df.dropna(subset=['Advertising_Expenditure'], inplace=True)
-recession_ad_exp = df[df['Recession']]['Advertising_Expenditure'].sum()
-non_recession_ad_exp = df[~df['Recession']]['Advertising_Expenditure'].sum()
+ad_by_period = fused_groupby(df, ['Recession'], {'Advertising_Expenditure': ('Advertising_Expenditure', 'sum')})['Advertising_Expenditure']
+recession_ad_exp = ad_by_period.get(True, 0)
+non_recession_ad_exp = ad_by_period.get(False, 0)
 
 labels = ['Recession Period', 'Non-Recession Period']
 ad_expenditures = [recession_ad_exp, non_recession_ad_exp]
@@ -147,7 +134,7 @@ plt.show()
 
 # Task 1.8: Pie chart for total advertisement expenditure by Vehicle Type during recession
 recession_df = df[df['Recession']]
-ad_expenditure_by_vehicle = recession_df.groupby('Vehicle_Type')['Advertising_Expenditure'].sum()
+ad_expenditure_by_vehicle = fused_groupby(recession_df, ['Vehicle_Type'], {'Advertising_Expenditure': ('Advertising_Expenditure', 'sum')})['Advertising_Expenditure']
 
 plt.figure(figsize=(8, 6))
 plt.pie(ad_expenditure_by_vehicle, labels=ad_expenditure_by_vehicle.index, autopct='%1.1f%%', startangle=90)
@@ -156,8 +143,6 @@ plt.axis('equal')
 plt.show()
 
 # Task 1.9: Lineplot to analyze the effect of the unemployment rate on vehicle sales during recession
-df.dropna(subset=['unemployment_rate'], inplace=True)
-
 plt.figure(figsize=(12, 6))
 sns.lineplot(data=recession_data, x='unemployment_rate', y='Automobile_Sales', hue='Vehicle_Type', markers=True)
 plt.title('Effect of Unemployment Rate on Vehicle Sales During Recession')
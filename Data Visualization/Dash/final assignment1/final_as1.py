@@ -5,24 +5,21 @@ import matplotlib as mpl
 import matplotlib.pyplot as plt
 import seaborn as sns
 import folium
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aggregate import fused_groupby
+from automobile_data import load_automobile_sales
 
 
 file_name = "historical_automobile_sales.csv"
-headers = [
-    "Date","Year", "Month","Recession","Consumer_Confidence","Seasonality_Weight",
-    "Price", "Advertising_Expenditure","Competition","GDP","Growth_Rate","unemployment_rate",
-    "Automobile_Sales","Vehicle_Type","City"
-]
 
-# Load the CSV file, assuming it has headers
-df = pd.read_csv(file_name, names=headers, header=0)
-
-# Convert Year and Automobile_Sales to numeric
-df['Year'] = pd.to_numeric(df['Year'], errors='coerce')
-df['Automobile_Sales'] = pd.to_numeric(df['Automobile_Sales'], errors='coerce')
+# Load the CSV once: numeric/boolean conversion, date parsing and NaN handling
+# all happen in the loader, so the tasks below share this one frame as-is
+df = load_automobile_sales(os.path.join(os.path.dirname(os.path.abspath(__file__)), file_name))
 
 # Group by Year and calculate the mean of Automobile_Sales
-df_line = df.groupby('Year')['Automobile_Sales'].mean()
+df_line = fused_groupby(df, ['Year'], {'Automobile_Sales': ('Automobile_Sales', 'mean')})['Automobile_Sales']
 
 # Create the line chart
 plt.figure(figsize=(10, 6))
@@ -34,16 +31,8 @@ plt.show()
 #TASK 1.2: Plot different lines for categories of vehicle type and analyse the trend to answer the question Is there a noticeable difference in sales trends between different vehicle types during recession periods?
 
 
-# Convert necessary columns to appropriate types
-df['Year'] = pd.to_numeric(df['Year'], errors='coerce')
-df['Automobile_Sales'] = pd.to_numeric(df['Automobile_Sales'], errors='coerce')
-df['Recession'] = df['Recession'].astype(bool)  # Assuming Recession is represented as 1/0 or True/False
-
-# Remove rows with NaN in 'Year' or 'Automobile_Sales'
-df = df.dropna(subset=['Year', 'Automobile_Sales', 'Vehicle_Type'])
-
 # Group data by Year, Vehicle_Type, and Recession, and calculate the mean sales
-df_grouped = df.groupby(['Year', 'Vehicle_Type', 'Recession'])['Automobile_Sales'].mean().reset_index()
+df_grouped = fused_groupby(df, ['Year', 'Vehicle_Type', 'Recession'], {'Automobile_Sales': ('Automobile_Sales', 'mean')}).reset_index()
 
 # Initialize the plot
 plt.figure(figsize=(12, 8))
@@ -69,16 +58,7 @@ plt.tight_layout()
 plt.show()
 #TASK 1.3: Use the functionality of Seaborn Library to create a visualization to compare the sales trend per vehicle type for a recession period with a non-recession period.
 
-# Convert necessary columns to appropriate types
-df['Year'] = pd.to_numeric(df['Year'], errors='coerce')
-df['Automobile_Sales'] = pd.to_numeric(df['Automobile_Sales'], errors='coerce')
-df['Recession'] = df['Recession'].astype(bool)  # Assuming Recession is represented as 1/0 or True/False
-
-# Drop rows with missing values in important columns
-df = df.dropna(subset=['Year', 'Automobile_Sales', 'Vehicle_Type'])
-
-# Group by Year, Vehicle_Type, and Recession, and calculate the mean sales
-df_grouped = df.groupby(['Year', 'Vehicle_Type', 'Recession'])['Automobile_Sales'].mean().reset_index()
+# df_grouped (mean sales by Year, Vehicle_Type and Recession) from Task 1.2 is reused
 
 # Set up the plot style and context
 sns.set(style="whitegrid")
@@ -105,17 +85,10 @@ plt.tight_layout()
 plt.show()
 #TASK 1.4: Use sub plotting to compare the variations in GDP during recession and non-recession period by developing line plots for each period.
 
-# Convert necessary columns to appropriate types
-df['Year'] = pd.to_numeric(df['Year'], errors='coerce')
-df['GDP'] = pd.to_numeric(df['GDP'], errors='coerce')
-df['Recession'] = df['Recession'].astype(bool)  # Assuming Recession is represented as 1/0 or True/False
-
-# Drop rows with missing values in important columns
-df = df.dropna(subset=['Year', 'GDP', 'Recession'])
-
-# Separate the data for recession and non-recession periods
-df_recession = df[df['Recession'] == True].groupby('Year')['GDP'].mean().reset_index()
-df_non_recession = df[df['Recession'] == False].groupby('Year')['GDP'].mean().reset_index()
+# Mean GDP per (Recession, Year) in one grouping, then split into the two periods
+gdp_by_period = fused_groupby(df, ['Recession', 'Year'], {'GDP': ('GDP', 'mean')}).reset_index()
+df_recession = gdp_by_period[gdp_by_period['Recession'] == True]
+df_non_recession = gdp_by_period[gdp_by_period['Recession'] == False]
 
 # Set up the subplots
 fig, axes = plt.subplots(1, 2, figsize=(14, 6), sharey=True)
@@ -139,13 +112,6 @@ plt.tight_layout(rect=[0, 0.03, 1, 0.95])
 plt.show()
 #TASK 1.5: Develop a Bubble plot for displaying the impact of seasonality on Automobile Sales.
 
-# Convert necessary columns to numeric types
-df['Automobile_Sales'] = pd.to_numeric(df['Automobile_Sales'], errors='coerce')
-df['Seasonality_Weight'] = pd.to_numeric(df['Seasonality_Weight'], errors='coerce')
-
-# Drop rows with missing values in important columns
-df = df.dropna(subset=['Automobile_Sales', 'Seasonality_Weight'])
-
 # Create bubble plot
 plt.figure(figsize=(10, 6))
 bubble_sizes = df['Automobile_Sales'] / 100  # Scale down bubble sizes for better visibility
@@ -165,14 +131,6 @@ breakpoint()
 # Filter the data for recession periods
 recession_data = df[df['Recession'] == 1]
 
-# Convert necessary columns to numeric types
-recession_data['Price'] = pd.to_numeric(recession_data['Price'], errors='coerce')
-recession_data['Automobile_Sales'] = pd.to_numeric(recession_data['Automobile_Sales'], errors='coerce')
-recession_data['Consumer_Confidence'] = pd.to_numeric(recession_data['Consumer_Confidence'], errors='coerce')
-
-# Drop rows with missing values in important columns
-recession_data = recession_data.dropna(subset=['Price', 'Automobile_Sales', 'Consumer_Confidence'])
-
 ### Scatter Plot 1: Average Vehicle Price vs. Automobile Sales (during recession)
 plt.figure(figsize=(10, 6))
 plt.scatter(recession_data['Price'], recession_data['Automobile_Sales'], alpha=0.6, color='blue', edgecolor='k')
@@ -193,16 +151,10 @@ plt.show()
 breakpoint()
 #TASK 1.7: Create a pie chart to display the portion of advertising expenditure of XYZAutomotives during recession and non-recession periods.
 
-# Ensure 'Advertising_Expenditure' and 'Recession' columns are numeric
-df['Advertising_Expenditure'] = pd.to_numeric(df['Advertising_Expenditure'], errors='coerce')
-df['Recession'] = pd.to_numeric(df['Recession'], errors='coerce')
-
-# Drop any rows with missing values in important columns
-df = df.dropna(subset=['Advertising_Expenditure', 'Recession'])
-
-# Separate advertising expenditures for recession and non-recession periods
-recession_ad_exp = df[df['Recession'] == 1]['Advertising_Expenditure'].sum()
-non_recession_ad_exp = df[df['Recession'] == 0]['Advertising_Expenditure'].sum()
+# Total advertising expenditure for recession and non-recession periods in one grouping
+ad_by_period = fused_groupby(df, ['Recession'], {'Advertising_Expenditure': ('Advertising_Expenditure', 'sum')})['Advertising_Expenditure']
+recession_ad_exp = ad_by_period.get(True, 0)
+non_recession_ad_exp = ad_by_period.get(False, 0)
 
 # Pie chart labels and data
 labels = ['Recession Period', 'Non-Recession Period']
@@ -219,16 +171,11 @@ breakpoint()
 
 #TASK 1.8: Develop a pie chart to display the total Advertisement expenditure for each vehicle type during recession period.
 
-# Convert necessary columns to numeric, and drop rows with missing data
-df['Advertising_Expenditure'] = pd.to_numeric(df['Advertising_Expenditure'], errors='coerce')
-df['Recession'] = pd.to_numeric(df['Recession'], errors='coerce')
-df = df.dropna(subset=['Advertising_Expenditure', 'Recession', 'Vehicle_Type'])
-
 # Filter data for recession periods only
 recession_df = df[df['Recession'] == 1]
 
 # Group by vehicle type and sum the advertising expenditure for each type
-ad_expenditure_by_vehicle = recession_df.groupby('Vehicle_Type')['Advertising_Expenditure'].sum()
+ad_expenditure_by_vehicle = fused_groupby(recession_df, ['Vehicle_Type'], {'Advertising_Expenditure': ('Advertising_Expenditure', 'sum')})['Advertising_Expenditure']
 
 # Plotting the pie chart
 plt.figure(figsize=(8, 6))
@@ -240,14 +187,6 @@ plt.show()
 #From the above plot, what insights have you gained on the sales of superminicar, smallfamilycar, mediumminicar?
 
 
-# Convert necessary columns to numeric
-df['Automobile_Sales'] = pd.to_numeric(df['Automobile_Sales'], errors='coerce')
-df['unemployment_rate'] = pd.to_numeric(df['unemployment_rate'], errors='coerce')
-df['Recession'] = pd.to_numeric(df['Recession'], errors='coerce')
-
-# Drop rows with missing data
-df = df.dropna(subset=['Automobile_Sales', 'unemployment_rate', 'Recession', 'Vehicle_Type'])
-
 # Filter for recession periods only
 recession_df = df[df['Recession'] == 1]
 
@@ -257,8 +196,7 @@ recession_df = recession_df[recession_df['Vehicle_Type'].isin(vehicle_types_of_i
 
 # Group by unemployment rate and vehicle type, then calculate the mean sales for each combination
 sales_by_unemployment_vehicle = (
-    recession_df.groupby(['unemployment_rate', 'Vehicle_Type'])['Automobile_Sales']
-    .mean()
+    fused_groupby(recession_df, ['unemployment_rate', 'Vehicle_Type'], {'Automobile_Sales': ('Automobile_Sales', 'mean')})
     .reset_index()
 )
 
@@ -0,0 +1,393 @@
+import bisect
+import hashlib
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+import urllib.error
+import urllib.parse
+import urllib.request
+
+import numpy as np
+import pandas as pd
+
+from dateparse import parse_dates
+
+# Shared data layer for the Australia wildfire dashboard (as2) and notes (assignment1).
+
+log = logging.getLogger(__name__)
+
+DATA_URL = 'https://cf-courses-data.s3.us.cloud-object-storage.appdomain.cloud/IBMDeveloperSkillsNetwork-DV0101EN-SkillsNetwork/Data%20Files/Historical_Wildfires.csv'
+
+MONTH_NAMES = ['January', 'February', 'March', 'April', 'May', 'June', 'July',
+               'August', 'September', 'October', 'November', 'December']
+# Fixed column types of the typed wildfire frame / snapshot. Count is a pixel
+# count so it stays integral; Date is datetime64, Year/Month are derived from it.
+WILDFIRE_DTYPES = {
+    'Region': 'category',
+    'Date': 'datetime64[ns]',
+    'Estimated_fire_area': 'float32',
+    'Mean_estimated_fire_brightness': 'float32',
+    'Mean_estimated_fire_radiative_power': 'float32',
+    'Mean_confidence': 'float32',
+    'Std_confidence': 'float32',
+    'Var_confidence': 'float32',
+    'Count': 'int32',
+    'Replaced': 'category',
+    'Year': 'int16',
+    'Month': 'int8',
+}
+# Measures kept in the aggregate cube, in axis order
+CUBE_MEASURES = ['Estimated_fire_area', 'Count']
+
+
+class WildfireCube:
+    """Dense per-(Region, Year, Month) sums and counts built once at startup.
+
+    sums has shape (regions, years, 12, measures), counts has shape
+    (regions, years, 12); means are derived from the two per request.
+    cum_sums / cum_counts are prefix sums of those along the year axis with a
+    leading zero row, so any year range costs two lookups per month.
+    version identifies the data the cube was built from, for cache keys.
+    Prefix sums that already exist (e.g. in shared memory) can be passed in.
+    """
+
+    def __init__(self, regions, years, sums, counts, version=0, cum_sums=None, cum_counts=None):
+        self.version = version
+        self.regions = list(regions)
+        self.years = [int(y) for y in years]
+        self.sums = sums
+        self.counts = counts
+        self._region_pos = {r: i for i, r in enumerate(self.regions)}
+        self._year_pos = {y: i for i, y in enumerate(self.years)}
+        zero = np.zeros_like(sums[:, :1])
+        if cum_sums is None:
+            cum_sums = np.concatenate([zero, np.cumsum(sums, axis=1)], axis=1)
+        if cum_counts is None:
+            cum_counts = np.concatenate([zero[..., 0], np.cumsum(counts, axis=1)], axis=1)
+        self.cum_sums = cum_sums
+        self.cum_counts = cum_counts
+
+    def cells(self, region, year):
+        """12 months of (sums, counts) for one region and year, zeros if absent."""
+        r = self._region_pos.get(region)
+        y = self._year_pos.get(int(year)) if year is not None else None
+        if r is None or y is None:
+            return np.zeros((12, len(CUBE_MEASURES))), np.zeros(12)
+        return self.sums[r, y], self.counts[r, y]
+
+    def range_cells(self, region, start, end):
+        """12 months of (sums, counts) for one region over the years start..end.
+
+        Served from the prefix sums: cum[end] - cum[start - 1] per month, so
+        the cost does not depend on how many years the range spans.
+        """
+        r = self._region_pos.get(region)
+        lo = bisect.bisect_left(self.years, int(start))
+        hi = bisect.bisect_right(self.years, int(end))
+        if r is None or hi <= lo:
+            return np.zeros((12, len(CUBE_MEASURES))), np.zeros(12)
+        return (self.cum_sums[r, hi] - self.cum_sums[r, lo],
+                self.cum_counts[r, hi] - self.cum_counts[r, lo])
+
+    def month_means(self, region, year):
+        """Monthly means of the cube measures for one region and year.
+
+        Returns a small frame with a Month column plus one column per measure.
+        """
+        return month_frame(*self.cells(region, year))
+
+    def range_month_means(self, region, start, end):
+        """Monthly means for one region over the years start..end inclusive."""
+        return month_frame(*self.range_cells(region, start, end))
+
+    def to_client(self):
+        """Compact JSON-ready form of the per-(Region, Year, Month) means.
+
+        means[region][year][month] is [area, count] or None for months
+        without records; used to render the dashboard in the browser.
+        """
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = np.round(self.sums / self.counts[..., None], 4)
+        present = self.counts > 0
+        nested = [[[means[r, y, m].tolist() if present[r, y, m] else None
+                    for m in range(12)]
+                   for y in range(len(self.years))]
+                  for r in range(len(self.regions))]
+        return {'regions': self.regions, 'years': self.years, 'months': MONTH_NAMES,
+                'measures': CUBE_MEASURES, 'means': nested}
+
+
+def month_frame(sums, counts):
+    """Month column plus one mean column per measure from 12 months of sums/counts.
+
+    Months without any records are left out, same as a groupby would do.
+    """
+    present = counts > 0
+    data = {'Month': [name for name, keep in zip(MONTH_NAMES, present) if keep]}
+    means = sums[present] / counts[present][:, None]
+    for i, measure in enumerate(CUBE_MEASURES):
+        data[measure] = means[:, i]
+    return pd.DataFrame(data)
+
+
+def build_cube(df, version=0):
+    """Aggregate a typed wildfire frame (Month as 1-12) into a WildfireCube."""
+    if isinstance(df['Region'].dtype, pd.CategoricalDtype):
+        # Typed frames carry Region dictionary encoded, use the codes directly
+        region_codes = df['Region'].cat.codes.to_numpy().astype(np.intp)
+        regions = df['Region'].cat.categories
+    else:
+        region_codes, regions = pd.factorize(df['Region'], sort=True)
+    year_codes, years = pd.factorize(df['Year'], sort=True)
+    month_codes = df['Month'].to_numpy().astype(np.intp) - 1
+    shape = (len(regions), len(years), 12)
+    flat = np.ravel_multi_index((region_codes, year_codes, month_codes), shape)
+    size = int(np.prod(shape))
+    counts = np.bincount(flat, minlength=size).reshape(shape)
+    sums = np.empty(shape + (len(CUBE_MEASURES),))
+    for i, measure in enumerate(CUBE_MEASURES):
+        values = df[measure].to_numpy(dtype='float64')
+        sums[..., i] = np.bincount(flat, weights=values, minlength=size).reshape(shape)
+    return WildfireCube(regions, years, sums, counts, version=version)
+
+
+class PartitionIndex:
+    """Row slices of a frame sorted by Region, Year and Date.
+
+    Every Region, and every (Region, Year) pair, occupies one contiguous run
+    of rows, so selecting it is an iloc slice instead of a boolean mask over
+    the whole frame.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self._regions = {}
+        self._region_years = {}
+        if isinstance(df['Region'].dtype, pd.CategoricalDtype):
+            # Compare the dictionary codes, not the region strings
+            regions = df['Region'].cat.codes.to_numpy()
+            names = df['Region'].cat.categories
+        else:
+            regions, names = pd.factorize(df['Region'])
+        years = df['Year'].to_numpy()
+        if len(df) == 0:
+            return
+        # Row positions where the (Region, Year) key changes
+        changed = (regions[1:] != regions[:-1]) | (years[1:] != years[:-1])
+        starts = np.concatenate(([0], np.flatnonzero(changed) + 1))
+        stops = np.append(starts[1:], len(df))
+        for start, stop in zip(starts, stops):
+            region, year = names[regions[start]], int(years[start])
+            self._region_years[(region, year)] = (start, stop)
+            first = self._regions.get(region, (start, stop))[0]
+            self._regions[region] = (first, stop)
+
+    @property
+    def regions(self):
+        return list(self._regions)
+
+    def region(self, region):
+        start, stop = self._regions.get(region, (0, 0))
+        return self.df.iloc[start:stop]
+
+    def region_year(self, region, year):
+        start, stop = self._region_years.get((region, int(year)), (0, 0))
+        return self.df.iloc[start:stop]
+
+    def region_sums(self, column):
+        """Per-region totals of column, reduced over the contiguous slices."""
+        starts = [start for start, _ in self._regions.values()]
+        values = self.df[column].to_numpy(dtype='float64')
+        return pd.Series(np.add.reduceat(values, starts) if starts else [],
+                         index=pd.Index(self.regions, name='Region'), name=column)
+
+
+def build_partition_index(df):
+    """Sort df by Region, Year and Date and index its partitions."""
+    ordered = df.sort_values(['Region', 'Year', 'Date'], kind='stable').reset_index(drop=True)
+    return PartitionIndex(ordered)
+
+
+def write_atomic(path, data):
+    """Replace path with data; the temp file is unique to this call, so
+    processes sharing a cache directory never rename each other's files."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or '.',
+                               prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def fetch_wildfires(url=DATA_URL, cache_dir='wildfire_cache', timeout=10):
+    """Read the wildfire CSV through a local on-disk cache.
+
+    The downloaded CSV, a parsed binary snapshot and the response validators
+    (ETag / Last-Modified) are kept in cache_dir. When a cached copy exists the
+    request is conditional, so an unchanged file costs a 304 and a snapshot
+    load instead of a download and CSV parse. If the server cannot be reached
+    (network error or 5xx) the cached snapshot is used, which lets the app
+    start offline; only a snapshot fetched from this same url qualifies.
+    Other HTTP errors (e.g. 404) are raised.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    csv_path = os.path.join(cache_dir, 'Historical_Wildfires.csv')
+    snapshot_path = os.path.join(cache_dir, 'Historical_Wildfires.npz')
+    meta_path = os.path.join(cache_dir, 'Historical_Wildfires.json')
+
+    meta = {}
+    if os.path.exists(meta_path) and os.path.exists(snapshot_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+    if meta.get('url') != url:
+        meta = {}
+
+    try:
+        body, headers = _download(url, meta, timeout)
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            # Not Modified: the cached copy is current (a snapshot from before
+            # sources were recorded is replaced by a full download)
+            df = _load_cached(snapshot_path, url)
+            if df is not None:
+                return df
+            body, headers = _download(url, {}, timeout)
+        elif e.code < 500:
+            raise
+        else:
+            log.warning('%s answered %s, falling back to the cached copy', url, e.code)
+            return _cached_or_raise(snapshot_path, url, e)
+    except (urllib.error.URLError, OSError) as e:
+        log.warning('cannot fetch %s (%s), falling back to the cached copy', url, e)
+        return _cached_or_raise(snapshot_path, url, e)
+
+    df = to_typed(pd.read_csv(io.BytesIO(body)))
+    write_atomic(csv_path, body)
+    save_snapshot(df, snapshot_path, source=url)
+    meta = {'url': url, 'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified')}
+    write_atomic(meta_path, json.dumps(meta).encode())
+    return df
+
+
+def source_version(url=DATA_URL, timeout=10):
+    """Version number of the data at url as it is now, None if unknown.
+
+    Derived from the file's mtime and size for file:// URLs and from the
+    ETag / Last-Modified of a HEAD request otherwise, so every process
+    watching the same source agrees on the number without coordinating.
+    """
+    parsed = urllib.parse.urlparse(url)
+    try:
+        if parsed.scheme in ('', 'file'):
+            stat = os.stat(urllib.request.url2pathname(parsed.path))
+            token = '{}:{}'.format(stat.st_mtime_ns, stat.st_size)
+        else:
+            request = urllib.request.Request(url, method='HEAD')
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                token = response.headers.get('ETag') or response.headers.get('Last-Modified')
+    except (urllib.error.URLError, OSError):
+        return None
+    if not token:
+        return None
+    digest = hashlib.blake2b(token.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') >> 1
+
+
+def _download(url, meta, timeout):
+    request = urllib.request.Request(url)
+    if meta.get('etag'):
+        request.add_header('If-None-Match', meta['etag'])
+    if meta.get('last_modified'):
+        request.add_header('If-Modified-Since', meta['last_modified'])
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return response.read(), response.headers
+
+
+def _load_cached(snapshot_path, url):
+    """The cached snapshot if it was fetched from url, else None."""
+    if os.path.exists(snapshot_path):
+        df, source = _read_snapshot(snapshot_path)
+        if source == url:
+            return df
+    return None
+
+
+def _cached_or_raise(snapshot_path, url, error):
+    df = _load_cached(snapshot_path, url)
+    if df is None:
+        raise error
+    return df
+
+
+def to_typed(raw):
+    """Convert the raw CSV frame to the fixed WILDFIRE_DTYPES schema."""
+    df = raw.copy()
+    dates = parse_dates(df['Date'])
+    df['Date'] = dates['Date']
+    df['Year'] = dates['Year']
+    df['Month'] = dates['Month']
+    return df.astype(WILDFIRE_DTYPES)[list(WILDFIRE_DTYPES)]
+
+
+def save_snapshot(df, path, source=None):
+    """Write a typed frame as a columnar .npz (categoricals as codes + categories).
+
+    source (e.g. the URL the data came from) is stored alongside the columns.
+    """
+    arrays = {}
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            arrays[col] = df[col].cat.codes.to_numpy()
+            arrays[col + '__categories'] = df[col].cat.categories.to_numpy(dtype=str)
+        else:
+            arrays[col] = df[col].to_numpy()
+    if source is not None:
+        arrays['__source'] = np.array(source)
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+    write_atomic(path, buffer.getvalue())
+
+
+def _read_snapshot(path):
+    with np.load(path) as data:
+        columns = {}
+        for col in WILDFIRE_DTYPES:
+            if WILDFIRE_DTYPES[col] == 'category':
+                columns[col] = pd.Categorical.from_codes(data[col], data[col + '__categories'])
+            else:
+                columns[col] = data[col]
+        source = str(data['__source']) if '__source' in data.files else None
+    return pd.DataFrame(columns), source
+
+
+def load_snapshot(path):
+    return _read_snapshot(path)[0]
+
+
+def load_wildfires(csv_path, snapshot_path=None):
+    """Load the wildfire data as a typed frame, converting the CSV only once.
+
+    The snapshot (default: the CSV path with .npz) is rebuilt whenever it is
+    missing or older than the CSV.
+    """
+    if snapshot_path is None:
+        snapshot_path = os.path.splitext(csv_path)[0] + '.npz'
+    if (os.path.exists(snapshot_path)
+            and os.path.getmtime(snapshot_path) >= os.path.getmtime(csv_path)):
+        return load_snapshot(snapshot_path)
+    df = to_typed(pd.read_csv(csv_path))
+    save_snapshot(df, snapshot_path)
+    return df
+
+
+if __name__ == '__main__':
+    # One-time conversion: python wildfire_data.py Historical_Wildfires.csv
+    for csv_file in sys.argv[1:]:
+        load_wildfires(csv_file)